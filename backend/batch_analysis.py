@@ -0,0 +1,134 @@
+"""
+Batch analysis: one resume against many JDs, or one JD against many resumes.
+
+Every document is chunked once and scored against the shared document in
+one batched encode, so ranking N pairs costs a single encode instead of N
+full /analyze calls. Similarities follow SIMILARITY_MODE and are computed
+from the same chunk texts / chunk embeddings as /analyze, so a pair gets
+the same score from both endpoints.
+
+Skills differ on purpose: /analyze compares the top retrieved skills
+chunks, which needs a hybrid search + rerank per document, while the batch
+compares each document's whole skills section. The optional LLM gap
+analysis for the top-ranked pairs goes through the full /analyze path.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+from gap_analysis_llm import compare_skill_lists_pure, split_skill_text
+from model_registry import get_embedder
+from resume_jd_rag import basic_clean, chunk_document, get_embeddings_and_store, split_into_sections
+from similarity_score import (
+    SIMILARITY_MODE,
+    compute_similarity_scores,
+    section_scores_from_embeddings,
+    weighted_section_similarity,
+)
+
+# (display name, raw text)
+NamedDocument = Tuple[str, str]
+# (chunk text, metadata)
+Chunks = List[Tuple[str, Dict]]
+
+
+def _skill_list(clean_text: str, doc_type: str) -> List[str]:
+    return split_skill_text(split_into_sections(clean_text, doc_type=doc_type).get("skills", ""))
+
+
+def _document_scores(anchor_chunks: Chunks, other_chunks: List[Chunks]) -> List[Tuple[float, float]]:
+    # /analyze encodes a document as its stored chunks joined by newlines.
+    anchor_text = "\n".join(t for t, _ in anchor_chunks)
+    return compute_similarity_scores(anchor_text, ["\n".join(t for t, _ in chunks) for chunks in other_chunks])
+
+
+def _chunk_scores(anchor_type: str, anchor_chunks: Chunks, other_chunks: List[Chunks]) -> List[Tuple[float, float]]:
+    import numpy as np
+
+    texts = [t for t, _ in anchor_chunks] + [t for chunks in other_chunks for t, _ in chunks]
+    if not texts:
+        return [(0.0, 0.0) for _ in other_chunks]
+
+    matrix = np.asarray(get_embedder().embed_documents(texts), dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+
+    def sections(chunks: Chunks) -> List[str]:
+        return [m.get("section", "other") for _, m in chunks]
+
+    anchor_matrix = matrix[:len(anchor_chunks)]
+    offset = len(anchor_chunks)
+    scores = []
+    for chunks in other_chunks:
+        other_matrix = matrix[offset: offset + len(chunks)]
+        offset += len(chunks)
+        if anchor_type == "resume":
+            section_scores = section_scores_from_embeddings(anchor_matrix, other_matrix, sections(chunks))
+        else:
+            section_scores = section_scores_from_embeddings(other_matrix, anchor_matrix, sections(anchor_chunks))
+        scores.append(weighted_section_similarity(section_scores))
+    return scores
+
+
+def run_batch_analysis(resumes: List[NamedDocument], jds: List[NamedDocument]) -> Dict[str, Any]:
+
+    if len(resumes) == 1 and jds:
+        anchor_type, anchor, others = "resume", resumes[0], jds
+    elif len(jds) == 1 and resumes:
+        anchor_type, anchor, others = "jd", jds[0], resumes
+    else:
+        raise ValueError("Batch analysis needs exactly one resume or exactly one JD on one side.")
+    other_type = "jd" if anchor_type == "resume" else "resume"
+
+    anchor_clean = basic_clean(anchor[1])
+    other_cleans = [basic_clean(text) for _, text in others]
+
+    anchor_chunks = chunk_document(anchor_clean, anchor_type)
+    other_chunks = [chunk_document(clean, other_type) for clean in other_cleans]
+
+    if SIMILARITY_MODE == "chunk":
+        scores = _chunk_scores(anchor_type, anchor_chunks, other_chunks)
+    else:
+        scores = _document_scores(anchor_chunks, other_chunks)
+
+    anchor_skills = _skill_list(anchor_clean, anchor_type)
+
+    results = []
+    for i, ((name, _), clean, (similarity, match_score)) in enumerate(zip(others, other_cleans, scores)):
+        other_skills = _skill_list(clean, other_type)
+        if anchor_type == "resume":
+            skills = compare_skill_lists_pure(anchor_skills, other_skills)
+        else:
+            skills = compare_skill_lists_pure(other_skills, anchor_skills)
+
+        results.append({
+            "index": i,
+            "name": name,
+            "similarity_score": similarity,
+            "match_score_0_10": match_score,
+            "skills": skills,
+        })
+
+    results.sort(key=lambda r: r["similarity_score"], reverse=True)
+    for rank, r in enumerate(results, start=1):
+        r["rank"] = rank
+
+    return {
+        "anchor_type": anchor_type,
+        "anchor_name": anchor[0],
+        "count": len(results),
+        "results": results,
+    }
+
+
+def ingest_pairs(anchor_type: str, anchor_text: str, other_texts: List[str]) -> List[Dict]:
+    """
+    get_embeddings_and_store for each (anchor, other) pair, one after another
+    so the shared document is embedded once and hits the ingestion cache
+    afterwards. The caller releases every returned collection.
+    """
+    store_infos = []
+    for other_text in other_texts:
+        if anchor_type == "resume":
+            store_infos.append(get_embeddings_and_store(anchor_text, other_text))
+        else:
+            store_infos.append(get_embeddings_and_store(other_text, anchor_text))
+    return store_infos
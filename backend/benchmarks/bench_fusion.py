@@ -0,0 +1,103 @@
+"""
+Compare BM25/vector fusion methods on the labelled sample resumes and JDs.
+
+For every fusion method and reranker shortlist size this reports:
+
+- shortlist recall: how often a relevant chunk is among the fused candidates
+  handed to the reranker,
+- recall@k and MRR after reranking,
+- hybrid_search latency and the number of pairs sent to the reranker.
+
+The reranker score cache and micro-batching are disabled by default so that
+every repeat pays for the cross-encoder.
+
+Run from backend/:
+
+    python -m benchmarks.bench_fusion --out bench_fusion.json
+"""
+
+import os
+
+os.environ.setdefault("RERANK_CACHE_SIZE", "0")
+os.environ.setdefault("RERANK_BATCHING", "0")
+
+import argparse
+import json
+import statistics
+import time
+
+from benchmarks.fixtures import LABELLED_QUERIES, build_stores, first_relevant_rank
+from collection_registry import release_collection
+from hybrid_retrieval import FUSION_METHODS, hybrid_search
+from model_registry import warmup_models
+
+
+def evaluate(stores, method: str, candidates: int, top_k: int, repeats: int):
+    shortlist_hits, hits, reciprocal_ranks, latencies = 0, 0, [], []
+
+    for q in LABELLED_QUERIES:
+        db = stores[q["doc"]]
+
+        shortlist = hybrid_search(
+            q["query"], db, top_k=candidates, use_rerank=False,
+            section_filter=q["section"], fusion=method,
+        )
+        if first_relevant_rank([r["text"] for r in shortlist], q["relevant"]):
+            shortlist_hits += 1
+
+        for _ in range(repeats):
+            start = time.perf_counter()
+            results = hybrid_search(
+                q["query"], db, top_k=top_k, use_rerank=True,
+                section_filter=q["section"], fusion=method, rerank_candidates=candidates,
+            )
+            latencies.append(time.perf_counter() - start)
+
+        rank = first_relevant_rank([r["text"] for r in results], q["relevant"])
+        hits += 1 if rank else 0
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+
+    ordered = sorted(latencies)
+    n = len(LABELLED_QUERIES)
+    return {
+        "shortlist_recall": round(shortlist_hits / n, 3),
+        f"recall@{top_k}": round(hits / n, 3),
+        "mrr": round(statistics.mean(reciprocal_ranks), 3),
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000, 2),
+        "rerank_pairs_per_query": candidates,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--methods", nargs="+", default=list(FUSION_METHODS), choices=FUSION_METHODS)
+    parser.add_argument("--candidates", nargs="+", type=int, default=[3, 6, 10], help="Reranker shortlist sizes")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--out", default="bench_fusion.json")
+    args = parser.parse_args()
+
+    warmup_models(("embedder", "reranker"))
+    stores, pairs = build_stores()
+
+    report = {"queries": len(LABELLED_QUERIES), "top_k": args.top_k, "results": {}}
+    try:
+        for method in args.methods:
+            report["results"][method] = {}
+            for candidates in args.candidates:
+                entry = evaluate(stores, method, candidates, args.top_k, args.repeats)
+                report["results"][method][str(candidates)] = entry
+                print(f"  {method} / {candidates} candidates: {entry}")
+    finally:
+        for resume_db, jd_db in pairs:
+            release_collection(resume_db)
+            release_collection(jd_db)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Compare torch / ONNX / int8 ONNX inference for the embedder, the similarity
+encoder and the reranker.
+
+For every model and backend this reports load time, latency per batch and
+texts (or pairs) per second. It also checks parity against the torch
+outputs: cosine similarity of embeddings, and max absolute difference and
+rank agreement of reranker scores.
+
+Run from backend/:
+
+    python -m benchmarks.bench_inference_backends --out bench_backends.json
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+
+from model_registry import (
+    EMBED_MODEL,
+    INFERENCE_BACKENDS,
+    RERANKER_MODEL,
+    SIMILARITY_MODEL,
+    build_cross_encoder,
+    build_sentence_transformer,
+)
+
+SAMPLE_TEXTS = [
+    "Python, FastAPI, Django, React, PostgreSQL, Docker, Kubernetes, AWS",
+    "Built a resume screening service that ranks candidates with hybrid BM25 and vector search.",
+    "Software Engineer Intern at Acme Corp: reduced API latency by 40% by adding Redis caching.",
+    "Requirements: 3+ years of backend development with Python or Go and experience with REST APIs.",
+    "Responsibilities include designing data pipelines, writing unit tests and mentoring juniors.",
+    "B.Tech in Computer Science, 8.7 CGPA, coursework in machine learning and databases.",
+    "Certified AWS Solutions Architect Associate; NPTEL Elite certificate in Deep Learning.",
+    "Preferred: familiarity with LangChain, vector databases and LLM prompt engineering.",
+]
+
+SAMPLE_QUERIES = [
+    "technical skills from resume",
+    "required skills job requirements",
+    "work experience achievements",
+]
+
+
+def _timed(fn, repeats: int):
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        out = fn()
+        latencies.append(time.perf_counter() - start)
+    return out, latencies
+
+
+def _latency_summary(latencies, items_per_call: int):
+    ordered = sorted(latencies)
+    p50 = statistics.median(ordered)
+    p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+    return {
+        "p50_ms": round(p50 * 1000, 2),
+        "p95_ms": round(p95 * 1000, 2),
+        "items_per_sec": round(items_per_call / p50, 1),
+    }
+
+
+def _rank_agreement(a, b) -> float:
+    """Spearman correlation between two score lists."""
+    ra = np.argsort(np.argsort(a))
+    rb = np.argsort(np.argsort(b))
+    return float(np.corrcoef(ra, rb)[0, 1])
+
+
+def bench_encoder(model_name: str, backends, texts, repeats: int):
+    results = {}
+    reference = None
+
+    for backend in backends:
+        start = time.perf_counter()
+        model = build_sentence_transformer(model_name, backend)
+        load_seconds = time.perf_counter() - start
+
+        encode = lambda: model.encode(texts, batch_size=len(texts), normalize_embeddings=True)
+        encode()  # warm-up
+        embeddings, latencies = _timed(encode, repeats)
+
+        entry = {"load_seconds": round(load_seconds, 2), **_latency_summary(latencies, len(texts))}
+        if reference is None:
+            reference = embeddings
+        else:
+            cos = np.sum(reference * embeddings, axis=1)
+            entry["parity_min_cosine"] = round(float(cos.min()), 5)
+            entry["parity_mean_cosine"] = round(float(cos.mean()), 5)
+        results[backend] = entry
+        print(f"  {model_name} [{backend}]: {entry}")
+
+    return results
+
+
+def bench_reranker(model_name: str, backends, pairs, repeats: int):
+    results = {}
+    reference = None
+
+    for backend in backends:
+        start = time.perf_counter()
+        model = build_cross_encoder(model_name, backend)
+        load_seconds = time.perf_counter() - start
+
+        predict = lambda: np.asarray(model.predict(pairs, batch_size=len(pairs)))
+        predict()  # warm-up
+        scores, latencies = _timed(predict, repeats)
+
+        entry = {"load_seconds": round(load_seconds, 2), **_latency_summary(latencies, len(pairs))}
+        if reference is None:
+            reference = scores
+        else:
+            entry["parity_max_abs_diff"] = round(float(np.max(np.abs(reference - scores))), 5)
+            entry["parity_rank_corr"] = round(_rank_agreement(reference, scores), 5)
+        results[backend] = entry
+        print(f"  {model_name} [{backend}]: {entry}")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=list(INFERENCE_BACKENDS), choices=INFERENCE_BACKENDS)
+    parser.add_argument("--batch-multiplier", type=int, default=4, help="Repeat the sample texts to build larger batches")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--out", default="bench_backends.json")
+    args = parser.parse_args()
+
+    # torch always runs first so the other backends are compared against it.
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    texts = SAMPLE_TEXTS * args.batch_multiplier
+    pairs = [[q, t] for q in SAMPLE_QUERIES for t in texts]
+
+    report = {"backends": backends, "batch_texts": len(texts), "batch_pairs": len(pairs), "models": {}}
+
+    print("Embedder")
+    report["models"]["embedder"] = bench_encoder(EMBED_MODEL, backends, texts, args.repeats)
+    print("Similarity encoder")
+    report["models"]["similarity"] = bench_encoder(SIMILARITY_MODEL, backends, texts, args.repeats)
+    print("Reranker")
+    report["models"]["reranker"] = bench_reranker(RERANKER_MODEL, backends, pairs, args.repeats)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
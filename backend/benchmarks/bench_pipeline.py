@@ -0,0 +1,252 @@
+"""
+End-to-end benchmark of the analysis pipeline, stage by stage.
+
+Groq is replaced by a local stub (benchmarks/groq_stub.py) with a fixed
+per-call latency, so runs need no API key and are repeatable. Stages:
+
+- ingest: chunk + embed + index one resume/JD pair (cold, no ingest cache)
+- expand_query: cold (LLM stub) and warm (cache hit)
+- hybrid_search: BM25 + vector + fusion, without and with reranking
+- rerank: cross-encoder over a fused shortlist
+- run_gap_analysis: the full /analyze pipeline on an ingested pair
+
+For every stage it reports latency percentiles and the process peak RSS
+after the stage; retrieval stages also report recall@k and MRR against the
+labelled fixture chunks, and run_gap_analysis is run at each requested
+concurrency to report throughput.
+
+Pass --baseline with an earlier report to fail (exit code 1) when a stage's
+p95 latency grows by more than --max-regression, or recall/MRR drops.
+
+Run from backend/:
+
+    python -m benchmarks.bench_pipeline --out bench_pipeline.json
+    python -m benchmarks.bench_pipeline --baseline bench_pipeline.json --out new.json
+"""
+
+import os
+
+os.environ.setdefault("RERANK_CACHE_SIZE", "0")
+
+import argparse
+import json
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fixtures import JDS, LABELLED_QUERIES, RESUMES, build_stores, first_relevant_rank
+from benchmarks.groq_stub import StubGroq
+from collection_registry import release_collection
+from gap_analysis_llm import run_gap_analysis
+from hybrid_retrieval import hybrid_search
+from llm_client import set_groq_client
+from model_registry import warmup_models
+from query_expansion import expand_query, expansion_cache_stats
+from reranker import rerank
+from resume_jd_rag import get_embeddings_and_store
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _percentiles(latencies):
+    ordered = sorted(latencies)
+    summary = {
+        f"p{p}_ms": round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000, 2)
+        for p in PERCENTILES
+    }
+    summary["mean_ms"] = round(sum(ordered) / len(ordered) * 1000, 2)
+    summary["samples"] = len(ordered)
+    return summary
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - start
+
+
+def _stage(latencies, **extra):
+    return {**_percentiles(latencies), **extra, "peak_rss_mb": _peak_rss_mb()}
+
+
+def bench_ingest():
+    """Ingest fresh copies of every fixture pair so the ingest cache never hits."""
+    latencies = []
+    jd_names = list(JDS)
+    for i, (name, text) in enumerate(RESUMES.items()):
+        jd = JDS[jd_names[i % len(jd_names)]]
+        nonce = f"\nRef {time.time_ns()}"
+        info, seconds = _timed(get_embeddings_and_store, text + nonce, jd + nonce)
+        latencies.append(seconds)
+        release_collection(info["resume_db"])
+        release_collection(info["jd_db"])
+    return _stage(latencies)
+
+
+def bench_expand_query(repeats: int):
+    queries = [q["query"] for q in LABELLED_QUERIES]
+    for q in queries:
+        expand_query(q)  # the warm samples below must all be cache hits
+
+    cold, warm = [], []
+    for r in range(repeats):
+        for q in queries:
+            _, seconds = _timed(expand_query, f"{q} #{r}-{time.time_ns()}")
+            cold.append(seconds)
+
+            hits = expansion_cache_stats()["hits"]
+            _, seconds = _timed(expand_query, q)
+            if expansion_cache_stats()["hits"] > hits:
+                warm.append(seconds)
+    return {"cold": _stage(cold), "warm": _stage(warm)}
+
+
+def bench_retrieval(stores, top_k: int, candidates: int, repeats: int):
+    stages = {}
+    for name, use_rerank in (("hybrid_search", False), ("hybrid_search_rerank", True)):
+        latencies, hits, reciprocal_ranks = [], 0, []
+        for q in LABELLED_QUERIES:
+            for _ in range(repeats):
+                results, seconds = _timed(
+                    hybrid_search, q["query"], stores[q["doc"]], top_k=top_k,
+                    use_rerank=use_rerank, section_filter=q["section"], rerank_candidates=candidates,
+                )
+                latencies.append(seconds)
+            rank = first_relevant_rank([r["text"] for r in results], q["relevant"])
+            hits += 1 if rank else 0
+            reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+
+        stages[name] = _stage(
+            latencies,
+            **{f"recall@{top_k}": round(hits / len(LABELLED_QUERIES), 3)},
+            mrr=round(sum(reciprocal_ranks) / len(reciprocal_ranks), 3),
+        )
+    return stages
+
+
+def bench_rerank(stores, top_k: int, candidates: int, repeats: int):
+    latencies = []
+    for q in LABELLED_QUERIES:
+        shortlist = hybrid_search(
+            q["query"], stores[q["doc"]], top_k=candidates, use_rerank=False, section_filter=q["section"],
+        )
+        texts = [r["text"] for r in shortlist]
+        for _ in range(repeats):
+            _, seconds = _timed(rerank, q["query"], texts, top_k)
+            latencies.append(seconds)
+    return _stage(latencies, pairs_per_call=candidates)
+
+
+def bench_gap_analysis(pairs, concurrency_levels, requests_per_level: int):
+    results = {}
+    for concurrency in concurrency_levels:
+        jobs = [pairs[i % len(pairs)] for i in range(requests_per_level)]
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            start = time.perf_counter()
+            timed = list(pool.map(lambda pair: _timed(run_gap_analysis, *pair)[1], jobs))
+            wall = time.perf_counter() - start
+        results[str(concurrency)] = _stage(timed, throughput_rps=round(len(jobs) / wall, 2))
+        print(f"  run_gap_analysis @ {concurrency}: {results[str(concurrency)]}")
+    return results
+
+
+def _flatten(report):
+    """{"stage/sub": metrics} for every leaf stage in the report."""
+    flat = {}
+
+    def walk(prefix, node):
+        if "p95_ms" in node:
+            flat[prefix] = node
+            return
+        for key, child in node.items():
+            if isinstance(child, dict):
+                walk(f"{prefix}/{key}" if prefix else key, child)
+
+    walk("", report["stages"])
+    return flat
+
+
+def compare_to_baseline(report, baseline, max_regression: float):
+    regressions = []
+    current = _flatten(report)
+    for stage, old in _flatten(baseline).items():
+        new = current.get(stage)
+        if new is None:
+            continue
+        if new["p95_ms"] > old["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{stage}: p95 {old['p95_ms']}ms -> {new['p95_ms']}ms")
+        for metric in [k for k in old if k.startswith("recall@") or k == "mrr"]:
+            if new.get(metric, 0) < old[metric]:
+                regressions.append(f"{stage}: {metric} {old[metric]} -> {new.get(metric)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-latency-ms", type=float, default=300, help="Stub latency per LLM call")
+    parser.add_argument("--llm-token-ms", type=float, default=2, help="Stub latency per generated token")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--rerank-candidates", type=int, default=6)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=16, help="run_gap_analysis calls per concurrency level")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed relative p95 increase")
+    parser.add_argument("--out", default="bench_pipeline.json")
+    args = parser.parse_args()
+
+    stub = StubGroq(latency_ms=args.llm_latency_ms, token_ms=args.llm_token_ms)
+    set_groq_client(stub)
+
+    start = time.perf_counter()
+    warmup_models(("embedder", "similarity", "reranker"))
+    report = {
+        "config": vars(args),
+        "model_warmup_seconds": round(time.perf_counter() - start, 2),
+        "rss_after_warmup_mb": _peak_rss_mb(),
+        "stages": {},
+    }
+    stages = report["stages"]
+
+    print("ingest")
+    stages["ingest"] = bench_ingest()
+    stores, pairs = build_stores()
+    try:
+        print("expand_query")
+        stages["expand_query"] = bench_expand_query(args.repeats)
+        print("hybrid_search")
+        stages.update(bench_retrieval(stores, args.top_k, args.rerank_candidates, args.repeats))
+        print("rerank")
+        stages["rerank"] = bench_rerank(stores, args.top_k, args.rerank_candidates, args.repeats)
+        print("run_gap_analysis")
+        stages["run_gap_analysis"] = bench_gap_analysis(pairs, args.concurrency, args.requests)
+    finally:
+        for resume_db, jd_db in pairs:
+            release_collection(resume_db)
+            release_collection(jd_db)
+
+    report["llm_stub_calls"] = stub.calls
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare_to_baseline(report, json.load(f), args.max_regression)
+        for line in regressions:
+            print(f"❌ {line}")
+        if regressions:
+            sys.exit(1)
+        print("✅ No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
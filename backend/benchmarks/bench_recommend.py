@@ -0,0 +1,171 @@
+"""
+Latency of /recommend-jobs across JD corpus sizes.
+
+Stage 1 (vector search) is the only part whose cost grows with the library,
+so it is measured on synthetic clustered JD vectors at each --sizes entry:
+index build time, query latency for the exact NumPy scan and for HNSW
+(when hnswlib is installed), and HNSW recall@k against the exact results.
+
+Stage 2 works on a fixed number of candidates; it is measured end to end
+by loading --e2e-jds generated JDs into a temporary JD library and calling
+recommend_jobs for each fixture resume.
+
+Run from backend/:
+
+    python -m benchmarks.bench_recommend --sizes 1000 10000 100000 --out bench_recommend.json
+"""
+
+import os
+import tempfile
+
+os.environ.setdefault("JD_LIBRARY_DIR", tempfile.mkdtemp(prefix="jd_library_bench_"))
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks.fixtures import JDS, RESUMES
+from job_recommender import JobIndex, hnswlib, recommend_jobs
+from model_registry import EMBED_DIM, warmup_models
+
+ROLES = ["Backend Engineer", "Data Scientist", "Frontend Developer", "ML Engineer", "DevOps Engineer", "Mobile Developer"]
+SKILLS = [
+    "Python", "Go", "Java", "PostgreSQL", "Redis", "Kafka", "Docker", "Kubernetes", "AWS", "GCP",
+    "React", "TypeScript", "Next.js", "GraphQL", "PyTorch", "TensorFlow", "scikit-learn", "Spark",
+    "Airflow", "Terraform", "Swift", "Kotlin", "Flutter", "FAISS", "LangChain", "Elasticsearch",
+]
+DUTIES = [
+    "Design and own services used by millions of customers.",
+    "Build data pipelines and keep them reliable.",
+    "Ship accessible, fast user interfaces.",
+    "Train, evaluate and deploy machine learning models.",
+    "Automate infrastructure and improve observability.",
+    "Mentor junior engineers and review pull requests.",
+]
+
+
+def _percentiles(latencies):
+    ordered = sorted(latencies)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000, 3),
+    }
+
+
+def synthetic_vectors(n: int, clusters: int = 200, noise: float = 0.35, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, EMBED_DIM)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, n)] + noise * rng.normal(size=(n, EMBED_DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def bench_stage1(sizes, queries: int, k: int):
+    results = {}
+    rng = np.random.default_rng(1)
+
+    for n in sizes:
+        vectors = synthetic_vectors(n)
+        ids = [f"jd_{i}" for i in range(n)]
+        query_vecs = vectors[rng.integers(0, n, queries)] + 0.2 * rng.normal(size=(queries, EMBED_DIM)).astype(np.float32)
+        query_vecs /= np.linalg.norm(query_vecs, axis=1, keepdims=True)
+
+        entry = {}
+        exact_hits = []
+        for backend in ["exact"] + (["hnsw"] if hnswlib is not None else []):
+            index = JobIndex(backend=backend)
+            start = time.perf_counter()
+            index.add(ids, vectors)
+            index.search(query_vecs[0], k)  # builds the HNSW graph
+            build_seconds = time.perf_counter() - start
+
+            latencies, hits = [], []
+            for q in query_vecs:
+                start = time.perf_counter()
+                hits.append({jd_id for jd_id, _ in index.search(q, k)})
+                latencies.append(time.perf_counter() - start)
+
+            entry[backend] = {"build_seconds": round(build_seconds, 2), **_percentiles(latencies)}
+            if backend == "exact":
+                exact_hits = hits
+            else:
+                recall = statistics.mean(len(h & e) / k for h, e in zip(hits, exact_hits))
+                entry[backend][f"recall@{k}_vs_exact"] = round(recall, 4)
+
+        results[str(n)] = entry
+        print(f"  {n} JDs: {entry}")
+    return results
+
+
+def synthetic_jd(rng: random.Random) -> str:
+    role = rng.choice(ROLES)
+    skills = rng.sample(SKILLS, 6)
+    duties = rng.sample(DUTIES, 3)
+    return "\n".join([
+        role,
+        "Requirements",
+        f"Strong experience with {skills[0]}, {skills[1]} and {skills[2]}.",
+        f"Familiarity with {skills[3]} or {skills[4]}; {skills[5]} is a plus.",
+        "Responsibilities",
+        *duties,
+    ])
+
+
+def bench_end_to_end(n_jds: int, repeats: int):
+    from jd_library import add_jd
+
+    rng = random.Random(0)
+    for name, text in JDS.items():
+        add_jd(text, title=name)
+    for i in range(n_jds):
+        add_jd(synthetic_jd(rng), title=f"synthetic_{i}")
+
+    recommend_jobs(next(iter(RESUMES.values())))  # builds the job index
+
+    totals, stages = [], {}
+    for _ in range(repeats):
+        for resume in RESUMES.values():
+            start = time.perf_counter()
+            result = recommend_jobs(resume)
+            totals.append(time.perf_counter() - start)
+            for stage, ms in result["timings"].items():
+                stages.setdefault(stage, []).append(ms / 1000)
+
+    return {
+        "library_jds": n_jds + len(JDS),
+        "total": _percentiles(totals),
+        "stages": {stage: _percentiles(values) for stage, values in stages.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=20, help="Candidates taken from stage 1")
+    parser.add_argument("--e2e-jds", type=int, default=200, help="Generated JDs for the end-to-end run (0 to skip)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--out", default="bench_recommend.json")
+    args = parser.parse_args()
+
+    report = {"hnswlib": hnswlib is not None, "k": args.k}
+
+    print("Stage 1: vector search")
+    report["stage1"] = bench_stage1(args.sizes, args.queries, args.k)
+
+    if args.e2e_jds:
+        print("End to end")
+        warmup_models(("embedder", "reranker"))
+        report["end_to_end"] = bench_end_to_end(args.e2e_jds, args.repeats)
+        print(f"  {report['end_to_end']}")
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Benchmark split_into_sections on a bulk corpus against the previous
+line-by-line keyword scans (kept below as legacy_split_into_sections).
+
+Every document is sectioned by both implementations and the outputs are
+compared, so the run also proves the compiled classifier is a drop-in
+replacement. Reports lines/sec and docs/sec for each.
+
+The corpus is a directory of .txt files, a JSONL file with a "text" field
+per line, or (by default) the sample fixtures repeated --copies times.
+
+Run from backend/:
+
+    python -m benchmarks.bench_sectioning --copies 2000 --out bench_sectioning.json
+    python -m benchmarks.bench_sectioning --corpus resumes.jsonl
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from typing import Dict, List
+
+from benchmarks.fixtures import JDS, RESUMES
+from resume_jd_rag import SECTION_KEYWORDS, basic_clean, split_into_sections
+
+
+# --- previous implementation, unchanged ----------------------------------
+
+def _normalize_heading(line: str) -> str:
+    return re.sub(r"[^a-zA-Z ]", " ", line.lower()).strip()
+
+
+def _looks_like_project(line: str) -> bool:
+    if "|" in line and len(line.split("|")[0].strip()) > 3:
+        return True
+    return False
+
+
+def _is_experience_line(text: str) -> bool:
+    text_l = text.lower()
+    strong_exp_keywords = [
+        "experience", "work experience",
+        "employment", "internship", "intern",
+        "worked at", "role", "responsibilities"
+    ]
+    return any(k in text_l for k in strong_exp_keywords)
+
+
+def _is_achievement_line(text: str) -> bool:
+    text_l = text.lower()
+    achievement_keywords = [
+        "award", "achievement", "certificate", "certification",
+        "certified", "nptel", "honored", "recognition", "prize",
+        "dr. a.p.j", "kalam"
+    ]
+    return any(k in text_l for k in achievement_keywords)
+
+
+def _detect_section_from_line(line: str) -> str:
+    norm = _normalize_heading(line)
+    for section, keywords in SECTION_KEYWORDS.items():
+        for kw in keywords:
+            if kw in norm:
+                return section
+    return ""
+
+
+def legacy_split_into_sections(raw_text: str, default_section="other") -> Dict[str, str]:
+    lines = raw_text.split("\n")
+    sections: Dict[str, List[str]] = {}
+    current_section = default_section
+
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            continue
+
+        if _looks_like_project(stripped):
+            current_section = "projects"
+            sections.setdefault("projects", []).append(stripped)
+            continue
+
+        if _is_experience_line(stripped):
+            current_section = "experience"
+            sections.setdefault("experience", [])
+            continue
+
+        if _is_achievement_line(stripped):
+            current_section = "achievements"
+            sections.setdefault("achievements", []).append(stripped)
+            continue
+
+        detected = _detect_section_from_line(stripped)
+
+        if detected == "experience" and not _is_experience_line(stripped):
+            detected = None
+
+        if detected:
+            current_section = detected
+            sections.setdefault(current_section, [])
+            continue
+
+        if current_section == "experience" and not _is_experience_line(stripped):
+            current_section = "other"
+
+        sections.setdefault(current_section, []).append(stripped)
+
+    return {sec: "\n".join(content).strip() for sec, content in sections.items()}
+
+
+# --------------------------------------------------------------------------
+
+def load_corpus(path: str, copies: int) -> List[str]:
+    if not path:
+        return list(RESUMES.values()) * copies + list(JDS.values()) * copies
+
+    if os.path.isdir(path):
+        docs = []
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".txt"):
+                with open(os.path.join(path, name), "r", encoding="utf-8", errors="ignore") as f:
+                    docs.append(f.read())
+        return docs
+
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line)["text"] for line in f if line.strip()]
+
+
+def _time(fn, docs, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for doc in docs:
+            fn(doc)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default="", help="Directory of .txt files or JSONL with a 'text' field")
+    parser.add_argument("--copies", type=int, default=1000, help="Fixture copies when no corpus is given")
+    parser.add_argument("--repeats", type=int, default=3, help="Best of N timings")
+    parser.add_argument("--out", default="bench_sectioning.json")
+    args = parser.parse_args()
+
+    docs = [basic_clean(d) for d in load_corpus(args.corpus, args.copies)]
+    n_lines = sum(1 for d in docs for line in d.split("\n") if line.strip())
+
+    mismatches = sum(1 for d in docs if split_into_sections(d) != legacy_split_into_sections(d))
+
+    report = {"documents": len(docs), "lines": n_lines, "mismatches": mismatches, "results": {}}
+    for name, fn in (("legacy", legacy_split_into_sections), ("compiled", split_into_sections)):
+        seconds = _time(fn, docs, args.repeats)
+        report["results"][name] = {
+            "seconds": round(seconds, 4),
+            "docs_per_sec": round(len(docs) / seconds, 1),
+            "lines_per_sec": round(n_lines / seconds, 1),
+        }
+        print(f"  {name}: {report['results'][name]}")
+
+    report["speedup"] = round(report["results"]["legacy"]["seconds"] / report["results"]["compiled"]["seconds"], 2)
+    print(f"  speedup: {report['speedup']}x, mismatches: {mismatches}")
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
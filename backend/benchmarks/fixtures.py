@@ -0,0 +1,173 @@
+"""
+Synthetic resumes and JDs with labelled queries, shared by the benchmarks.
+
+Each labelled query names the document it runs against, an optional section
+filter and the marker phrases that identify the relevant chunks: a retrieved
+chunk counts as relevant when it contains any of them.
+"""
+
+from typing import Dict, List
+
+RESUMES: Dict[str, str] = {
+    "backend_engineer": """Arjun Mehta
+Professional Summary
+Backend engineer focused on Python services, search and data pipelines.
+Technical Skills
+Python, FastAPI, Django, PostgreSQL, Redis, Docker, Kubernetes, AWS Lambda
+Elasticsearch, Kafka, Celery, gRPC, pytest
+Work Experience
+Software Engineer Intern at Finlytics
+Cut p95 API latency from 480ms to 120ms by adding a Redis read-through cache.
+Migrated nightly settlement jobs from cron scripts to Celery workers on Kubernetes.
+Projects
+LedgerLens | FastAPI, PostgreSQL, React
+Reconciliation dashboard that matches bank statements to invoices with fuzzy matching.
+QuickShard | Go, gRPC
+Consistent-hashing key value store with replication and anti-entropy repair.
+Education
+B.Tech in Computer Science, VIT University, 8.6 CGPA
+Achievements
+Winner, Smart India Hackathon 2023 for a grievance routing system.
+AWS Certified Developer Associate
+""",
+    "ml_engineer": """Priya Raman
+Summary
+Machine learning engineer building retrieval and ranking systems.
+Skills
+PyTorch, scikit-learn, Hugging Face Transformers, LangChain, FAISS, Chroma
+Python, SQL, Spark, Airflow, MLflow, Docker
+Work Experience
+Data Science Intern at MedIndex
+Trained a BERT classifier for clinical note triage reaching 0.91 macro F1.
+Built an Airflow pipeline that refreshes embeddings for 2M documents weekly.
+Projects
+CareerCompass | LangChain, Chroma, FastAPI
+Resume and job description matcher using hybrid BM25 and vector retrieval with reranking.
+SpecTune | PyTorch
+Speech command recognizer distilled to run on a Raspberry Pi at 30ms per utterance.
+Education
+M.Tech in Artificial Intelligence, IIT Madras
+Achievements
+NPTEL Elite certificate in Deep Learning
+Kaggle competition silver medal in tabular playground series.
+""",
+    "frontend_engineer": """Sara Thomas
+Profile
+Frontend developer who cares about accessibility and performance.
+Key Skills
+JavaScript, TypeScript, React, Next.js, Redux, Tailwind CSS, Jest, Cypress
+Node.js, GraphQL, Figma, Webpack, Vite
+Work Experience
+Frontend Intern at ShopSwift
+Reduced checkout bundle size by 35% with route-based code splitting.
+Rebuilt the product filter panel to meet WCAG 2.1 AA accessibility guidelines.
+Projects
+TrailMap | React, Mapbox, Firebase
+Offline-first hiking planner with cached vector tiles and elevation profiles.
+InkBoard | Next.js, WebSockets
+Collaborative whiteboard with CRDT-based conflict-free syncing.
+Education
+B.E. in Information Technology, Anna University
+Achievements
+Recognition for best UI at HackBangalore 2022.
+""",
+}
+
+JDS: Dict[str, str] = {
+    "backend_role": """Senior Backend Engineer
+About the role
+We are building the payments platform for small businesses across India.
+Requirements
+3+ years of backend development in Python or Go.
+Strong experience with PostgreSQL schema design and query tuning.
+Hands-on with Docker, Kubernetes and at least one public cloud such as AWS.
+Responsibilities
+Design and own REST and gRPC services for settlement and reconciliation.
+Build event-driven pipelines on Kafka with exactly-once processing.
+Mentor junior engineers and review pull requests.
+Nice to have
+Experience with Redis caching strategies and observability with Prometheus.
+""",
+    "ml_role": """Machine Learning Engineer, Search
+About us
+A job marketplace that matches candidates to roles with semantic search.
+Requirements
+Solid Python and PyTorch; experience fine-tuning transformer models.
+Familiarity with vector databases such as FAISS, Chroma or Pinecone.
+Experience evaluating ranking quality with recall and MRR.
+Responsibilities
+Own the candidate retrieval stack from embeddings to cross-encoder reranking.
+Run offline evaluations and online A/B tests for ranking changes.
+Productionize models behind low-latency APIs.
+""",
+}
+
+# query, doc, section filter (None = whole document), relevant marker phrases
+LABELLED_QUERIES: List[Dict] = [
+    {"doc": "resume:backend_engineer", "query": "caching to reduce API latency", "section": None,
+     "relevant": ["Redis read-through cache"]},
+    {"doc": "resume:backend_engineer", "query": "distributed key value store", "section": None,
+     "relevant": ["QuickShard", "Consistent-hashing"]},
+    {"doc": "resume:backend_engineer", "query": "hackathon win", "section": None,
+     "relevant": ["Smart India Hackathon"]},
+    {"doc": "resume:backend_engineer", "query": "python web frameworks and databases", "section": "skills",
+     "relevant": ["FastAPI, Django, PostgreSQL"]},
+    {"doc": "resume:ml_engineer", "query": "text classification model for medical notes", "section": None,
+     "relevant": ["BERT classifier"]},
+    {"doc": "resume:ml_engineer", "query": "hybrid search with reranking project", "section": None,
+     "relevant": ["hybrid BM25 and vector retrieval"]},
+    {"doc": "resume:ml_engineer", "query": "edge deployment of a speech model", "section": None,
+     "relevant": ["Raspberry Pi"]},
+    {"doc": "resume:ml_engineer", "query": "embedding refresh data pipeline", "section": None,
+     "relevant": ["Airflow pipeline"]},
+    {"doc": "resume:frontend_engineer", "query": "web accessibility compliance", "section": None,
+     "relevant": ["WCAG 2.1 AA"]},
+    {"doc": "resume:frontend_engineer", "query": "javascript bundle size optimization", "section": None,
+     "relevant": ["code splitting"]},
+    {"doc": "resume:frontend_engineer", "query": "real-time collaborative editing", "section": None,
+     "relevant": ["CRDT"]},
+    {"doc": "jd:backend_role", "query": "database design and performance", "section": None,
+     "relevant": ["PostgreSQL schema design"]},
+    {"doc": "jd:backend_role", "query": "streaming events message queue", "section": None,
+     "relevant": ["Kafka"]},
+    {"doc": "jd:backend_role", "query": "container orchestration cloud", "section": None,
+     "relevant": ["Docker, Kubernetes"]},
+    {"doc": "jd:ml_role", "query": "ranking metrics evaluation", "section": None,
+     "relevant": ["recall and MRR", "offline evaluations"]},
+    {"doc": "jd:ml_role", "query": "vector database experience", "section": None,
+     "relevant": ["FAISS, Chroma or Pinecone"]},
+    {"doc": "jd:ml_role", "query": "serving models with low latency", "section": None,
+     "relevant": ["low-latency APIs"]},
+]
+
+
+def build_stores():
+    """
+    Ingest every fixture document, pairing resumes with JDs in turn.
+
+    Returns ({"resume:<name>" / "jd:<name>": db}, [(resume_db, jd_db), ...]);
+    every pair was acquired and must be released by the caller.
+    """
+    from resume_jd_rag import get_embeddings_and_store
+
+    stores, pairs = {}, []
+    jd_names = list(JDS)
+    for i, (name, text) in enumerate(RESUMES.items()):
+        jd_name = jd_names[i % len(jd_names)]
+        info = get_embeddings_and_store(text, JDS[jd_name])
+        stores[f"resume:{name}"] = info["resume_db"]
+        stores[f"jd:{jd_name}"] = info["jd_db"]
+        pairs.append((info["resume_db"], info["jd_db"]))
+    return stores, pairs
+
+
+def is_relevant(text: str, markers: List[str]) -> bool:
+    return any(m.lower() in text.lower() for m in markers)
+
+
+def first_relevant_rank(texts: List[str], markers: List[str]) -> int:
+    """1-based rank of the first relevant text, or 0 if none is relevant."""
+    for rank, text in enumerate(texts, start=1):
+        if is_relevant(text, markers):
+            return rank
+    return 0
@@ -0,0 +1,67 @@
+"""
+Local stand-in for the Groq client, so benchmarks measure our own pipeline
+without network calls, API keys or rate limits.
+
+It implements the parts of client.chat.completions.create the backend uses:
+plain completions, JSON-mode completions (query planner) and streaming.
+Each call sleeps for a fixed latency plus a per-token delay, so LLM-bound
+stages keep a realistic shape under concurrency.
+"""
+
+import json
+import time
+from types import SimpleNamespace
+from typing import Dict, List
+
+GAP_ANALYSIS_TEXT = (
+    "Overall the resume is a reasonable match for this role.\n"
+    "- Strong overlap on Python services, containers and databases.\n"
+    "- Missing evidence of event-driven pipelines and mentoring.\n"
+    "Suggestions:\n"
+    "- Add a project that uses Kafka or another message queue.\n"
+    "- Quantify the impact of the caching and migration work.\n"
+)
+
+
+class _Completions:
+    def __init__(self, stub: "StubGroq"):
+        self._stub = stub
+
+    def create(self, model: str, messages: List[Dict], stream: bool = False, response_format=None, **kwargs):
+        prompt = messages[-1]["content"]
+        text = self._stub.reply(prompt, json_mode=bool(response_format))
+        self._stub.calls += 1
+
+        time.sleep(self._stub.latency)
+        if stream:
+            return self._stream(text)
+
+        time.sleep(self._stub.token_delay * len(text.split()))
+        message = SimpleNamespace(content=text)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    def _stream(self, text: str):
+        for word in text.split(" "):
+            time.sleep(self._stub.token_delay)
+            delta = SimpleNamespace(content=word + " ")
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+class StubGroq:
+    def __init__(self, latency_ms: float = 300, token_ms: float = 2):
+        self.latency = latency_ms / 1000
+        self.token_delay = token_ms / 1000
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=_Completions(self))
+
+    def reply(self, prompt: str, json_mode: bool = False) -> str:
+        if json_mode:
+            return json.dumps({
+                "rewritten": "What skills am I missing for this role?",
+                "expanded": "missing skills gap requirements technologies experience",
+                "target": "both",
+            })
+        if "search-optimized query" in prompt:
+            query = prompt.split('User query: "', 1)[-1].split('"', 1)[0]
+            return f"{query} skills technologies experience tools frameworks"
+        return GAP_ANALYSIS_TEXT
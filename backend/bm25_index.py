@@ -0,0 +1,124 @@
+"""
+In-process BM25 indexes, kept per Chroma collection and per section.
+
+Indexes are filled at ingest time (see resume_jd_rag.get_embeddings_and_store)
+so hybrid_search never has to re-read and re-tokenize a collection per query.
+"""
+
+from threading import Lock
+from typing import Dict, List, Optional
+
+from rank_bm25 import BM25Okapi
+from langchain_chroma import Chroma
+
+
+def tokenize(text: str) -> List[str]:
+    return text.lower().split()
+
+
+class SectionIndex:
+    """BM25 over one section of a collection (or the whole collection)."""
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.texts: List[str] = []
+        self.metas: List[Dict] = []
+        self.tokens: List[List[str]] = []
+        self._bm25: Optional[BM25Okapi] = None
+        self._lock = Lock()
+
+    def add(self, ids: List[str], texts: List[str], metas: List[Dict]):
+        with self._lock:
+            self.ids.extend(ids)
+            self.texts.extend(texts)
+            self.metas.extend(metas)
+            self.tokens.extend(tokenize(t) for t in texts)
+            # BM25Okapi keeps corpus-wide IDF stats, so it is rebuilt lazily
+            # from the cached tokens on the next query.
+            self._bm25 = None
+
+    @property
+    def bm25(self) -> Optional[BM25Okapi]:
+        with self._lock:
+            if self._bm25 is None and self.tokens:
+                self._bm25 = BM25Okapi(self.tokens)
+            return self._bm25
+
+    def get_scores(self, query: str):
+        bm25 = self.bm25
+        if bm25 is None:
+            return []
+        return bm25.get_scores(tokenize(query))
+
+
+class CollectionIndex:
+    def __init__(self):
+        self.all = SectionIndex()
+        self.sections: Dict[str, SectionIndex] = {}
+        self._lock = Lock()
+
+    def add(self, ids: List[str], texts: List[str], metas: List[Dict]):
+        by_section: Dict[str, List[int]] = {}
+        for i, m in enumerate(metas):
+            by_section.setdefault(m.get("section"), []).append(i)
+
+        self.all.add(ids, texts, metas)
+        for section, idxs in by_section.items():
+            with self._lock:
+                sec_index = self.sections.setdefault(section, SectionIndex())
+            sec_index.add([ids[i] for i in idxs], [texts[i] for i in idxs], [metas[i] for i in idxs])
+
+    def section(self, section_filter: Optional[str] = None) -> Optional[SectionIndex]:
+        if section_filter is None:
+            return self.all
+        return self.sections.get(section_filter)
+
+
+_INDEXES: Dict[str, CollectionIndex] = {}
+_LOCK = Lock()
+_BUILD_LOCK = Lock()
+
+
+def collection_name(db: Chroma) -> str:
+    return db._collection.name
+
+
+def index_texts(name: str, ids: List[str], texts: List[str], metadatas: List[Dict]):
+    """Add chunks to the BM25 index of a collection, creating it if needed."""
+    if not texts:
+        return
+    metadatas = metadatas or [{} for _ in texts]
+    with _LOCK:
+        index = _INDEXES.setdefault(name, CollectionIndex())
+    index.add(ids, texts, metadatas)
+
+
+def get_index(db: Chroma) -> CollectionIndex:
+    """
+    Return the index for a collection. Collections that were not indexed at
+    ingest time are read from Chroma once and cached.
+    """
+    name = collection_name(db)
+    with _LOCK:
+        index = _INDEXES.get(name)
+    if index is not None:
+        return index
+
+    with _BUILD_LOCK:
+        with _LOCK:
+            index = _INDEXES.get(name)
+        if index is not None:
+            return index
+
+        raw = db._collection.get()
+        docs = raw.get("documents", []) or []
+        metas = raw.get("metadatas") or [{} for _ in docs]
+        index_texts(name, raw["ids"], docs, [m or {} for m in metas])
+
+        with _LOCK:
+            return _INDEXES.setdefault(name, CollectionIndex())
+
+
+def drop_index(name: str):
+    with _LOCK:
+        _INDEXES.pop(name, None)
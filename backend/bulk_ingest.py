@@ -0,0 +1,311 @@
+"""
+Offline bulk loader for resume / JD corpora.
+
+Streams documents from a directory (.txt and .pdf files) or a JSONL file
+(one {"id": ..., "text": ...} object per line), chunks them with the same
+cleaning, sectioning and splitting as /analyze on a process pool, embeds
+the chunks in large batches and upserts them into a persistent Chroma
+collection, or with --target library appends them to the JD library
+(jd_library.py) that /analyze can use by jd_id.
+
+Documents are processed in blocks; the next block is chunked while the
+current one is embedded. After every block the number of documents fully
+written is checkpointed next to the Chroma data, so an interrupted run
+continues where it stopped. Chunk IDs are derived from the document ID,
+so re-running a block never duplicates chunks.
+
+Run from backend/:
+
+    python bulk_ingest.py jds.jsonl --doc-type jd --persist-dir ./chroma_jds
+    python bulk_ingest.py ./resumes/ --doc-type resume --persist-dir ./chroma_resumes --workers 8
+    python bulk_ingest.py jds.jsonl --target library
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from jd_library import text_hash
+
+CHECKPOINT_FILE = "bulk_ingest_checkpoint.json"
+
+# (doc_id, title, file path or None, text or None)
+SourceDocument = Tuple[str, str, Optional[str], Optional[str]]
+
+
+def iter_documents(source: str, bad_lines: Optional[List[str]] = None) -> Iterator[SourceDocument]:
+    """Documents of a directory or JSONL file. Malformed JSONL lines are skipped and appended to bad_lines."""
+    if os.path.isdir(source):
+        for entry in sorted(os.scandir(source), key=lambda e: e.name):
+            if entry.is_file() and entry.name.lower().endswith((".txt", ".pdf")):
+                yield entry.name, os.path.splitext(entry.name)[0], entry.path, None
+        return
+
+    with open(source, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                doc = (str(record.get("id", line_no)), record.get("title", ""), None, record["text"])
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                print(f"⚠️ Skipping line {line_no} of {source}: {e!r}")
+                if bad_lines is not None:
+                    bad_lines.append(f"line {line_no}")
+                continue
+            yield doc
+
+
+def _read_text(path: str) -> str:
+    if path.lower().endswith(".pdf"):
+        from pdf_ingest import extract_pdf_text
+
+        with open(path, "rb") as f:
+            # Documents are already spread over the pool; don't nest another.
+            return extract_pdf_text(f, parallel=False)
+
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+def chunk_source_document(doc: SourceDocument, doc_type: str):
+    """
+    Pool worker: returns (doc_id, title, cleaned text,
+    [(chunk text, metadata)], error or None).
+    """
+    from resume_jd_rag import basic_clean, chunk_document
+
+    doc_id, title, path, text = doc
+    try:
+        if path is not None:
+            text = _read_text(path)
+        clean = basic_clean(text or "")
+        chunks = chunk_document(clean, doc_type)
+    except Exception as e:
+        return doc_id, title, "", [], str(e)
+
+    for _, meta in chunks:
+        meta["doc_id"] = doc_id
+    return doc_id, title, clean, chunks, None
+
+
+def load_checkpoint(path: str, source: str, collection: str) -> Tuple[int, List[str]]:
+    """(documents done, failed entries) of a previous run over the same source and collection."""
+    if not os.path.exists(path):
+        return 0, []
+    with open(path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get("source") != os.path.abspath(source) or state.get("collection") != collection:
+        print(f"⚠️ Checkpoint {path} is for a different source or collection, starting over")
+        return 0, []
+    return int(state.get("documents_done", 0)), list(state.get("failed", []))
+
+
+def save_checkpoint(path: str, state: Dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _blocks(docs: Iterator[SourceDocument], size: int) -> Iterator[List[SourceDocument]]:
+    while True:
+        block = list(islice(docs, size))
+        if not block:
+            return
+        yield block
+
+
+class _ChunkWriter:
+    """Buffers chunks and embeds / upserts them into Chroma embed_batch at a time."""
+
+    def __init__(self, db, embedder, embed_batch: int):
+        self.db = db
+        self.embedder = embedder
+        self.embed_batch = embed_batch
+        self.ids: List[str] = []
+        self.texts: List[str] = []
+        self.metas: List[Dict] = []
+
+    def add(self, doc_id: str, title: str, clean: str, chunks):
+        for text, meta in chunks:
+            self.ids.append(f"{doc_id}:{meta['section']}:{meta['chunk_id']}")
+            self.texts.append(text)
+            self.metas.append(meta)
+            if len(self.texts) >= self.embed_batch:
+                self.flush()
+
+    def flush(self):
+        if not self.texts:
+            return
+        embeddings = self.embedder.embed_documents(self.texts)
+        self.db._collection.upsert(ids=self.ids, embeddings=embeddings, documents=self.texts, metadatas=self.metas)
+        self.ids, self.texts, self.metas = [], [], []
+
+
+class _LibraryWriter:
+    """Buffers whole JDs, embeds their chunks in batches and appends them to the JD library."""
+
+    def __init__(self, library, embedder, embed_batch: int):
+        self.library = library
+        self.embedder = embedder
+        self.embed_batch = embed_batch
+        self.pending: List[Tuple[str, str, str, List]] = []
+        self.n_chunks = 0
+
+    def add(self, doc_id: str, title: str, clean: str, chunks):
+        existing = self.library.get(doc_id)
+        existing_hash = existing["hash"] if existing else next(
+            (text_hash(p[2]) for p in self.pending if p[0] == doc_id), None
+        )
+        if existing_hash is not None:
+            # Already loaded (e.g. a rerun); a different text under the same ID is skipped.
+            if existing_hash != text_hash(clean):
+                print(f"⚠️ Skipping {doc_id}: a different JD with this ID is already in the library")
+            return
+
+        self.pending.append((doc_id, title, clean, chunks))
+        self.n_chunks += len(chunks)
+        if self.n_chunks >= self.embed_batch:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        texts = [t for _, _, _, chunks in self.pending for t, _ in chunks]
+        embeddings = []
+        for start in range(0, len(texts), self.embed_batch):
+            embeddings.extend(self.embedder.embed_documents(texts[start: start + self.embed_batch]))
+
+        entries, offset = [], 0
+        for doc_id, title, clean, chunks in self.pending:
+            entries.append((doc_id, title, clean, chunks, embeddings[offset: offset + len(chunks)]))
+            offset += len(chunks)
+        self.library.add(entries)
+        self.pending, self.n_chunks = [], 0
+
+
+def run_bulk_ingest(args) -> Dict:
+    from model_registry import EMBED_MODEL, get_embedder
+
+    os.makedirs(args.persist_dir, exist_ok=True)
+    checkpoint_path = os.path.join(args.persist_dir, CHECKPOINT_FILE)
+    collection = "jd_library" if args.target == "library" else args.collection or f"{args.doc_type}_corpus"
+
+    skip, failed = (0, []) if args.restart else load_checkpoint(checkpoint_path, args.source, collection)
+    if skip:
+        print(f"↩️ Resuming after {skip} documents")
+
+    embedder = get_embedder()
+    embedder.encode_kwargs["batch_size"] = args.encode_batch_size
+    if args.target == "library":
+        from jd_library import JDLibrary
+
+        writer = _LibraryWriter(JDLibrary(args.persist_dir), embedder, args.embed_batch)
+    else:
+        from langchain_chroma import Chroma
+
+        db = Chroma(collection_name=collection, embedding_function=embedder, persist_directory=args.persist_dir)
+        writer = _ChunkWriter(db, embedder, args.embed_batch)
+
+    state = {
+        "source": os.path.abspath(args.source),
+        "collection": collection,
+        "embed_model": EMBED_MODEL,
+        "documents_done": skip,
+        "failed": failed,
+    }
+    stats = {"documents": 0, "chunks": 0, "failed": 0}
+    start = time.perf_counter()
+
+    bad_lines: List[str] = []
+    blocks = _blocks(islice(iter_documents(args.source, bad_lines), skip, None), args.block_size)
+
+    def submit(pool, block) -> List[Future]:
+        return [pool.submit(chunk_source_document, doc, args.doc_type) for doc in block]
+
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pending = submit(pool, next(blocks, []))
+        while pending:
+            # Chunk the next block while this one is embedded.
+            upcoming = submit(pool, next(blocks, []))
+
+            for future in pending:
+                doc_id, title, clean, chunks, error = future.result()
+                if error:
+                    print(f"⚠️ Skipping {doc_id}: {error}")
+                    state["failed"].append(doc_id)
+                    stats["failed"] += 1
+                    continue
+                writer.add(doc_id, title, clean, chunks)
+                stats["chunks"] += len(chunks)
+            writer.flush()
+
+            # Lines read so far that were not valid documents (the next block is already read).
+            # On resume the skipped prefix is parsed again, so its bad lines are already recorded.
+            recorded = set(state["failed"])
+            new_bad_lines = [line for line in bad_lines if line not in recorded]
+            state["failed"].extend(new_bad_lines)
+            stats["failed"] += len(new_bad_lines)
+            bad_lines.clear()
+
+            stats["documents"] += len(pending)
+            state["documents_done"] += len(pending)
+            save_checkpoint(checkpoint_path, state)
+
+            elapsed = time.perf_counter() - start
+            print(
+                f"📦 {state['documents_done']} documents | {stats['chunks']} chunks | "
+                f"{stats['documents'] / elapsed:.1f} docs/sec"
+            )
+            pending = upcoming
+
+    elapsed = time.perf_counter() - start
+    return {
+        **stats,
+        "collection": collection,
+        "persist_dir": args.persist_dir,
+        "seconds": round(elapsed, 2),
+        "docs_per_sec": round(stats["documents"] / elapsed, 1) if elapsed else 0.0,
+        "chunks_per_sec": round(stats["chunks"] / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="Directory of .txt/.pdf files or a JSONL file")
+    parser.add_argument("--doc-type", choices=("resume", "jd"), default="jd")
+    parser.add_argument(
+        "--target", choices=("chroma", "library"), default="chroma",
+        help="chroma: persistent Chroma collection; library: the JD library used by /analyze (JDs only)",
+    )
+    parser.add_argument("--persist-dir", default="", help="Chroma directory, or the JD library directory (default JD_LIBRARY_DIR)")
+    parser.add_argument("--collection", default="", help="Defaults to <doc-type>_corpus")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Chunking processes")
+    parser.add_argument("--block-size", type=int, default=1000, help="Documents per checkpointed block")
+    parser.add_argument("--embed-batch", type=int, default=2048, help="Chunks per embed/upsert call")
+    parser.add_argument("--encode-batch-size", type=int, default=128, help="Model batch size inside each embed call")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    if args.target == "library":
+        if args.doc_type != "jd":
+            parser.error("--target library only holds JDs")
+        if not args.persist_dir:
+            from jd_library import JD_LIBRARY_DIR
+
+            args.persist_dir = JD_LIBRARY_DIR
+    elif not args.persist_dir:
+        parser.error("--persist-dir is required for --target chroma")
+
+    summary = run_bulk_ingest(args)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,69 @@
 
-from fastapi import APIRouter
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from groq import Groq
-import memory_db
-from hybrid_retrieval import hybrid_search
-from history_rewrite import rewrite_query
+from query_planner import plan_query
 from chat_retrieval import retrieve_context_for_chat
+from collection_registry import release_collection
+from session_store import CHAT_HISTORY_LIMIT, get_session
+from executors import run_cpu, run_io
+from llm_client import get_groq_client
+from sse import sse_event, sse_response, token_events
 
 
 router = APIRouter()
 
-CHAT_HISTORY = [] 
-
-def get_client():
-    import os
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        raise RuntimeError("Missing GROQ_API_KEY")
-    return Groq(api_key=api_key)
+def get_client() -> Groq:
+    return get_groq_client()
 
 
 
 class ChatRequest(BaseModel):
     message: str
+    session_id: Optional[str] = None
 
 
-@router.post("/chat")
-async def chat(req: ChatRequest):
-    global CHAT_HISTORY
+async def _prepare_chat(req: ChatRequest):
+    # Without a session the chat still works, just with no resume/JD context.
+    # The collections are held until retrieval is done, so a concurrent
+    # eviction of the session cannot delete them mid-request.
+    session = get_session(req.session_id, acquire=True)
+    if req.session_id and session is None:
+        raise HTTPException(status_code=404, detail="Session not found or expired. Run /analyze again.")
 
+    try:
+        return await _prepare_chat_context(req, session)
+    finally:
+        if session:
+            release_collection(session.resume_db)
+            release_collection(session.jd_db)
+
+
+async def _prepare_chat_context(req: ChatRequest, session):
     user_msg = req.message
-    CHAT_HISTORY.append({"role": "user", "content": user_msg})
+    history = session.history_snapshot() if session else []
+    history = (history + [{"role": "user", "content": user_msg}])[-CHAT_HISTORY_LIMIT:]
 
 
-    rewritten = rewrite_query(CHAT_HISTORY, user_msg)
+    plan = await run_io(plan_query, history, user_msg)
+    rewritten = plan["rewritten"]
 
 
-    retrieval = retrieve_context_for_chat(rewritten, k=3)
+    retrieval = await run_cpu(
+        retrieve_context_for_chat,
+        rewritten,
+        resume_db=session.resume_db if session else None,
+        jd_db=session.jd_db if session else None,
+        k=3,
+        expanded_query=plan["expanded"],
+        target=plan["target"],
+    )
 
     resume_text = retrieval["resume_context"]
     jd_text = retrieval["jd_context"]
 
-    resume_chunks = resume_text
-    jd_chunks = jd_text
-
-
 
     prompt = f"""
 You are a career assistant AI.
@@ -65,9 +84,31 @@ JD Context:
 {jd_text or "NO JD CONTEXT FOUND"}
 """
 
+    return session, rewritten, retrieval, prompt
+
+
+def _chat_metadata(rewritten: str, retrieval: dict) -> dict:
+    return {
+        "rewritten_query": rewritten,
+        "target": retrieval["target"],
+        "resume_retrieved_chunks": retrieval.get("resume_chunks", []),
+        "jd_retrieved_chunks": retrieval.get("jd_chunks", []),
+    }
+
+
+def _save_turn(session, user_msg: str, answer: str):
+    if session:
+        session.add_chat_turn("user", user_msg)
+        session.add_chat_turn("assistant", answer)
+
+
+@router.post("/chat")
+async def chat(req: ChatRequest):
+    session, rewritten, retrieval, prompt = await _prepare_chat(req)
 
     client = get_client()
-    resp = client.chat.completions.create(
+    resp = await run_io(
+        client.chat.completions.create,
         model="llama-3.1-8b-instant",
         messages=[{"role": "user", "content": prompt}],
         max_tokens=300,
@@ -77,15 +118,39 @@ JD Context:
     answer = resp.choices[0].message.content.strip()
 
 
-    CHAT_HISTORY.append({"role": "assistant", "content": answer})
+    _save_turn(session, req.message, answer)
 
 
-    CHAT_HISTORY = CHAT_HISTORY[-12:]
+    return {"answer": answer, **_chat_metadata(rewritten, retrieval)}
 
 
-    return {
-        "answer": answer,
-        "rewritten_query": rewritten,
-        "resume_retrieved_chunks": retrieval.get("resume_chunks", []),
-        "jd_retrieved_chunks": retrieval.get("jd_chunks", []),
-    }
+@router.post("/chat/stream")
+async def chat_stream(req: ChatRequest):
+    """
+    Server-Sent Events version of /chat: a "meta" event with the retrieval
+    results, "token" events as the answer is generated, then "done".
+    """
+    session, rewritten, retrieval, prompt = await _prepare_chat(req)
+
+    def events():
+        yield sse_event("meta", _chat_metadata(rewritten, retrieval))
+
+        stream = get_client().chat.completions.create(
+            model="llama-3.1-8b-instant",
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=300,
+            temperature=0.4,
+            stream=True,
+        )
+        tokens = (c.choices[0].delta.content for c in stream if c.choices and c.choices[0].delta.content)
+
+        parts = []
+        yield from token_events(tokens, parts)
+
+        answer = "".join(parts).strip()
+        _save_turn(session, req.message, answer)
+        yield sse_event("done", {"answer": answer})
+
+    # Starlette iterates sync generators in a worker thread, so the blocking
+    # Groq stream does not hold up the event loop.
+    return sse_response(events())
@@ -1,6 +1,6 @@
-from typing import Dict
+from typing import Dict, Optional
 
-import memory_db
+from langchain_chroma import Chroma
 from intent_detection import QueryTarget, target_for_retrieval
 from query_expansion import expand_query
 from hybrid_retrieval import hybrid_search
@@ -13,16 +13,28 @@ def _docs_to_text(docs) -> str:
     )
 
 
-def retrieve_context_for_chat(query: str, k: int = 3) -> Dict[str, object]:
+def retrieve_context_for_chat(
+    query: str,
+    resume_db: Optional[Chroma],
+    jd_db: Optional[Chroma],
+    k: int = 3,
+    expanded_query: Optional[str] = None,
+    target: Optional[QueryTarget] = None,
+) -> Dict[str, object]:
     """
     Retrieve resume / JD context for chat using:
     - query expansion
     - hybrid retrieval (BM25 + vectors)
     - reranking
+
+    expanded_query / target can be passed in when they were already
+    produced by the query planner.
     """
 
-    expanded_query = expand_query(query)
-    target = target_for_retrieval(query)
+    if expanded_query is None:
+        expanded_query = expand_query(query)
+    if target is None:
+        target = target_for_retrieval(query)
 
     resume_context = ""
     jd_context = ""
@@ -32,10 +44,10 @@ def retrieve_context_for_chat(query: str, k: int = 3) -> Dict[str, object]:
 
     # Resume retrieval
     if target in (QueryTarget.RESUME, QueryTarget.BOTH):
-        if getattr(memory_db, "resume_db", None):
+        if resume_db is not None:
             resume_chunks = hybrid_search(
                 search_query=expanded_query,
-                db=memory_db.resume_db,
+                db=resume_db,
                 top_k=k,
                 bm25_k=20,
                 vec_k=20,
@@ -46,10 +58,10 @@ def retrieve_context_for_chat(query: str, k: int = 3) -> Dict[str, object]:
 
     # JD retrieval
     if target in (QueryTarget.JD, QueryTarget.BOTH):
-        if getattr(memory_db, "jd_db", None):
+        if jd_db is not None:
             jd_chunks = hybrid_search(
                 search_query=expanded_query,
-                db=memory_db.jd_db,
+                db=jd_db,
                 top_k=k,
                 bm25_k=20,
                 vec_k=20,
@@ -0,0 +1,112 @@
+"""
+Lifecycle tracking for the in-memory Chroma collections built per /analyze.
+
+Every collection created by get_embeddings_and_store is registered here.
+Sessions acquire a reference when they start using a collection and release
+it when they are replaced or evicted; a collection is deleted from Chroma
+(together with its BM25 and dense indexes) once nothing references it.
+Collections that were never acquired, e.g. because /analyze failed
+half-way, are removed by reap_orphans after a grace period.
+"""
+
+import time
+from threading import Lock
+from typing import Any, Dict, List
+
+from langchain_chroma import Chroma
+
+from bm25_index import collection_name, drop_index
+from dense_index import drop_dense_index
+from model_registry import EMBED_DIM
+
+_collections: Dict[str, Dict[str, Any]] = {}
+_lock = Lock()
+_stats = {"created": 0, "deleted": 0}
+
+
+def _estimate_bytes(texts: List[str], metadatas: List[Dict]) -> int:
+    text_bytes = sum(len(t.encode("utf-8")) for t in texts)
+    meta_bytes = sum(len(str(m)) for m in metadatas)
+    # float32 embeddings are held twice: in Chroma and in the dense index.
+    return text_bytes + meta_bytes + len(texts) * EMBED_DIM * 4 * 2
+
+
+def register_collection(db: Chroma, texts: List[str], metadatas: List[Dict]):
+    name = collection_name(db)
+    with _lock:
+        entry = _collections.get(name)
+        if entry is None:
+            entry = _collections[name] = {
+                "db": db,
+                "refs": 0,
+                "chunks": 0,
+                "bytes": 0,
+                "created_at": time.time(),
+            }
+            _stats["created"] += 1
+        entry["chunks"] += len(texts)
+        entry["bytes"] += _estimate_bytes(texts, metadatas)
+
+
+def acquire_collection(db: Chroma):
+    if db is None:
+        return
+    with _lock:
+        entry = _collections.get(collection_name(db))
+        if entry is not None:
+            entry["refs"] += 1
+
+
+def _delete(name: str, db: Chroma):
+    drop_index(name)
+    drop_dense_index(name)
+    try:
+        db.delete_collection()
+    except Exception as e:
+        print(f"⚠️ Could not delete collection {name}: {e}")
+
+
+def release_collection(db: Chroma):
+    if db is None:
+        return
+    name = collection_name(db)
+    with _lock:
+        entry = _collections.get(name)
+        if entry is None:
+            return
+        entry["refs"] -= 1
+        if entry["refs"] > 0:
+            return
+        del _collections[name]
+        _stats["deleted"] += 1
+
+    _delete(name, db)
+
+
+def reap_orphans(grace_seconds: float) -> int:
+    """Delete collections that nothing has acquired within grace_seconds."""
+    now = time.time()
+    with _lock:
+        orphans = [
+            (name, entry["db"])
+            for name, entry in _collections.items()
+            if entry["refs"] <= 0 and now - entry["created_at"] > grace_seconds
+        ]
+        for name, _ in orphans:
+            del _collections[name]
+        _stats["deleted"] += len(orphans)
+
+    for name, db in orphans:
+        _delete(name, db)
+    return len(orphans)
+
+
+def collection_stats() -> Dict[str, int]:
+    with _lock:
+        return {
+            "live_collections": len(_collections),
+            "live_chunks": sum(e["chunks"] for e in _collections.values()),
+            "live_bytes": sum(e["bytes"] for e in _collections.values()),
+            "unreferenced": sum(1 for e in _collections.values() if e["refs"] <= 0),
+            **_stats,
+        }
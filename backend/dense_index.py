@@ -0,0 +1,144 @@
+"""
+In-process dense indexes, kept per Chroma collection.
+
+Per-session collections only hold tens of chunks, so the dense leg of
+hybrid_search is a single matrix-vector product over normalized chunk
+embeddings held in NumPy, instead of a Chroma query that re-embeds the
+query every time. Query embeddings are cached as well.
+"""
+
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_chroma import Chroma
+
+from bm25_index import collection_name
+from model_registry import EMBED_DIM, get_embedder
+
+QUERY_EMBED_CACHE_SIZE = int(os.getenv("QUERY_EMBED_CACHE_SIZE", "2048"))
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    return matrix / (np.linalg.norm(matrix, axis=-1, keepdims=True) + 1e-12)
+
+
+class DenseIndex:
+    def __init__(self):
+        self.ids: List[str] = []
+        self.texts: List[str] = []
+        self.metas: List[Dict] = []
+        self.matrix = np.zeros((0, EMBED_DIM), dtype=np.float32)
+        self.section_rows: Dict[Optional[str], np.ndarray] = {}
+        self._lock = Lock()
+
+    def add(self, ids: List[str], texts: List[str], metas: List[Dict], embeddings):
+        if not texts:
+            return
+        rows = _normalize(np.asarray(embeddings, dtype=np.float32))
+
+        with self._lock:
+            self.ids = self.ids + list(ids)
+            self.texts = self.texts + list(texts)
+            self.metas = self.metas + list(metas)
+            self.matrix = np.vstack([self.matrix, rows]) if len(self.matrix) else rows
+
+            sections = np.array([m.get("section") for m in self.metas], dtype=object)
+            self.section_rows = {
+                section: np.flatnonzero(sections == section)
+                for section in set(sections.tolist())
+            }
+
+    def rows(self, section_filter: Optional[str] = None) -> np.ndarray:
+        if section_filter is None:
+            return np.arange(len(self.texts))
+        return self.section_rows.get(section_filter, np.zeros(0, dtype=int))
+
+    def search(self, query_vec: np.ndarray, k: int, section_filter: Optional[str] = None) -> List[Tuple[int, float]]:
+        """Return (row, cosine similarity) for the top k rows, best first."""
+        matrix = self.matrix
+        rows = self.rows(section_filter)
+        if len(rows) == 0:
+            return []
+
+        scores = matrix[rows] @ query_vec
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(rows[i]), float(scores[i])) for i in top]
+
+
+_INDEXES: Dict[str, DenseIndex] = {}
+_LOCK = Lock()
+_BUILD_LOCK = Lock()
+
+
+def index_embeddings(name: str, ids: List[str], texts: List[str], metadatas: List[Dict], embeddings):
+    with _LOCK:
+        index = _INDEXES.setdefault(name, DenseIndex())
+    index.add(ids, texts, metadatas, embeddings)
+
+
+def get_dense_index(db: Chroma) -> DenseIndex:
+    """
+    Return the dense index for a collection, loading the stored embeddings
+    from Chroma once if it was not indexed at ingest time.
+    """
+    name = collection_name(db)
+    with _LOCK:
+        index = _INDEXES.get(name)
+    if index is not None:
+        return index
+
+    with _BUILD_LOCK:
+        with _LOCK:
+            index = _INDEXES.get(name)
+        if index is not None:
+            return index
+
+        raw = db._collection.get(include=["documents", "metadatas", "embeddings"])
+        docs = raw.get("documents") or []
+        embeddings = raw.get("embeddings")
+        if docs and embeddings is not None:
+            metas = raw.get("metadatas") or [{} for _ in docs]
+            index_embeddings(name, raw["ids"], docs, [m or {} for m in metas], embeddings)
+
+        with _LOCK:
+            return _INDEXES.setdefault(name, DenseIndex())
+
+
+def drop_dense_index(name: str):
+    with _LOCK:
+        _INDEXES.pop(name, None)
+
+
+_query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_query_lock = Lock()
+_query_stats = {"hits": 0, "misses": 0}
+
+
+def embed_query_cached(query: str) -> np.ndarray:
+    with _query_lock:
+        cached = _query_cache.get(query)
+        if cached is not None:
+            _query_cache.move_to_end(query)
+            _query_stats["hits"] += 1
+            return cached
+        _query_stats["misses"] += 1
+
+    vec = _normalize(np.asarray(get_embedder().embed_query(query), dtype=np.float32))
+
+    with _query_lock:
+        _query_cache[query] = vec
+        while len(_query_cache) > QUERY_EMBED_CACHE_SIZE:
+            _query_cache.popitem(last=False)
+    return vec
+
+
+def dense_index_stats() -> Dict[str, int]:
+    with _LOCK:
+        n_indexes = len(_INDEXES)
+    with _query_lock:
+        return {"indexes": n_indexes, "query_cache_entries": len(_query_cache), **_query_stats}
@@ -0,0 +1,59 @@
+"""
+Executors for blocking work called from async endpoints.
+
+Model inference, Chroma writes and PDF parsing run on the CPU pool; Groq
+calls and other network-bound work run on the I/O pool. Keeping them apart
+stops slow LLM round-trips from occupying the threads needed for inference,
+and keeps the event loop free to accept other requests.
+
+Page extraction for large PDFs is spread over a process pool, created on
+first use.
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from threading import Lock
+
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(os.cpu_count() or 2)))
+IO_WORKERS = int(os.getenv("IO_WORKERS", "32"))
+PROCESS_WORKERS = int(os.getenv("PROCESS_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_cpu_pool = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="cpu")
+_io_pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="io")
+
+_process_pool = None
+_process_lock = Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        with _process_lock:
+            if _process_pool is None:
+                # spawn, not fork: the server process already runs threads
+                # and holds the models, none of which the workers need.
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=PROCESS_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _process_pool
+
+
+async def run_cpu(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_cpu_pool, functools.partial(fn, *args, **kwargs))
+
+
+async def run_io(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_io_pool, functools.partial(fn, *args, **kwargs))
+
+
+def shutdown_executors():
+    _cpu_pool.shutdown(wait=False)
+    _io_pool.shutdown(wait=False)
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False)
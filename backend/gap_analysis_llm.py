@@ -2,25 +2,18 @@
 
 import os
 import json
-from typing import Dict, Any, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional
 import re
 from langchain_chroma import Chroma
-from groq import Groq
+from llm_client import get_groq_client
 
-from similarity_score import compute_similarity_score
+from similarity_score import SIMILARITY_MODE, compute_chunk_similarity_score, compute_similarity_score
 from query_expansion import expand_query
 from hybrid_retrieval import hybrid_search
 
 
 
-def get_groq_client() -> Groq:
-    api_key = os.environ.get("GROQ_API_KEY")
-    if not api_key:
-        raise RuntimeError("❌ GROQ_API_KEY not set.")
-    return Groq(api_key=api_key)
-
-
-
 def _ensure_chunk_dict(c: Any, default_section: str = "other") -> Dict[str, Any]:
     if isinstance(c, dict):
         if "section" not in c:
@@ -38,97 +31,94 @@ def _normalize_chunk_list(chunks: List[Any], default_section: str) -> List[Dict[
 
 
 
-def _retrieve_weighted_resume_context(resume_db: Chroma) -> List[Dict[str, Any]]:
-    if resume_db is None:
-        return [_ensure_chunk_dict("Resume missing.", "other")]
+# (expansion query, section filter, top_k) for each weighted retrieval.
+RESUME_RETRIEVALS = [
+    ("technical skills from resume", "skills", 3),
+    ("work experience achievements", "experience", 3),
+    ("important projects", "projects", 2),
+]
 
-    collected = []
+JD_RETRIEVALS = [
+    ("required skills job requirements", "requirements", 4),
+    ("responsibilities tasks", "responsibilities", 3),
+]
 
+# Used when the section retrievals find fewer than 2 chunks (e.g. a JD
+# without headings). Submitted with them so it never adds a serial step.
+JD_FALLBACK_RETRIEVAL = ("skills technologies job description", None, 2)
 
-    skills_raw = hybrid_search(
-        search_query=expand_query("technical skills from resume"),
-        db=resume_db,
-        top_k=3,
-        bm25_k=20,
-        vec_k=20,
-        use_rerank=True,
-        section_filter="skills",
-    )
-    collected.extend(_normalize_chunk_list(skills_raw, "skills"))
+# Fixed queries whose expansions are pre-warmed at startup.
+GAP_ANALYSIS_QUERIES = [
+    q for q, _, _ in RESUME_RETRIEVALS + JD_RETRIEVALS + [JD_FALLBACK_RETRIEVAL]
+]
 
+# Upper bound on sub-retrievals / scoring running at once, shared by all
+# /analyze requests in the worker.
+GAP_ANALYSIS_MAX_WORKERS = int(os.environ.get("GAP_ANALYSIS_MAX_WORKERS", "6"))
 
-    exp_raw = hybrid_search(
-        search_query=expand_query("work experience achievements"),
-        db=resume_db,
-        top_k=3,
-        bm25_k=20,
-        vec_k=20,
-        use_rerank=True,
-        section_filter="experience",
-    )
-    for c in _normalize_chunk_list(exp_raw, "experience"):
-        if c not in collected:
-            collected.append(c)
+_executor = ThreadPoolExecutor(
+    max_workers=GAP_ANALYSIS_MAX_WORKERS,
+    thread_name_prefix="gap-analysis",
+)
 
 
-    proj_raw = hybrid_search(
-        search_query=expand_query("important projects"),
-        db=resume_db,
-        top_k=2,
+def _section_search(db: Chroma, query: str, section: Optional[str], top_k: int) -> List[Dict[str, Any]]:
+    raw = hybrid_search(
+        search_query=expand_query(query),
+        db=db,
+        top_k=top_k,
         bm25_k=20,
         vec_k=20,
         use_rerank=True,
-        section_filter="projects",
+        section_filter=section,
     )
-    for c in _normalize_chunk_list(proj_raw, "projects"):
-        if c not in collected:
-            collected.append(c)
+    return _normalize_chunk_list(raw, section or "other")
 
-    return collected
 
-def _retrieve_weighted_jd_context(jd_db: Chroma) -> List[Dict[str, Any]]:
-    if jd_db is None:
-        return [_ensure_chunk_dict("JD missing.", "other")]
+def _submit_retrievals(db: Chroma, specs) -> List[Future]:
+    return [_executor.submit(_section_search, db, q, section, k) for q, section, k in specs]
 
+
+def _submit_jd_retrievals(db: Chroma) -> List[Future]:
+    return _submit_retrievals(db, JD_RETRIEVALS + [JD_FALLBACK_RETRIEVAL])
+
+
+def _merge_unique(chunk_lists: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
     collected = []
+    seen = set()
+    for chunks in chunk_lists:
+        for c in chunks:
+            key = c.get("id") or c.get("text")
+            if key not in seen:
+                seen.add(key)
+                collected.append(c)
+    return collected
 
-    req_raw = hybrid_search(
-        search_query=expand_query("required skills job requirements"),
-        db=jd_db,
-        top_k=4,
-        bm25_k=20,
-        vec_k=20,
-        use_rerank=True,
-        section_filter="requirements",
-    )
-    collected.extend(_normalize_chunk_list(req_raw, "requirements"))
 
-    resp_raw = hybrid_search(
-        search_query=expand_query("responsibilities tasks"),
-        db=jd_db,
-        top_k=3,
-        bm25_k=20,
-        vec_k=20,
-        use_rerank=True,
-        section_filter="responsibilities",
-    )
-    for c in _normalize_chunk_list(resp_raw, "responsibilities"):
-        if c not in collected:
-            collected.append(c)
+def _retrieve_weighted_resume_context(
+    resume_db: Chroma, futures: Optional[List[Future]] = None
+) -> List[Dict[str, Any]]:
+    if resume_db is None:
+        return [_ensure_chunk_dict("Resume missing.", "other")]
 
+    futures = futures or _submit_retrievals(resume_db, RESUME_RETRIEVALS)
+    return _merge_unique([f.result() for f in futures])
+
+def _retrieve_weighted_jd_context(
+    jd_db: Chroma, futures: Optional[List[Future]] = None
+) -> List[Dict[str, Any]]:
+    if jd_db is None:
+        return [_ensure_chunk_dict("JD missing.", "other")]
+
+    # The last future is always the speculative JD_FALLBACK_RETRIEVAL.
+    futures = futures or _submit_jd_retrievals(jd_db)
+    *section_futures, fallback = futures
+    collected = _merge_unique([f.result() for f in section_futures])
 
     if len(collected) < 2:
-        gen_raw = hybrid_search(
-            search_query=expand_query("skills technologies job description"),
-            db=jd_db,
-            top_k=2,
-            bm25_k=20,
-            vec_k=20,
-            use_rerank=True,
-        )
-        for c in _normalize_chunk_list(gen_raw, "other"):
-            if c not in collected:
-                collected.append(c)
+        collected = _merge_unique([collected, fallback.result()])
+    else:
+        fallback.cancel()  # no-op if it already started; its result is dropped
 
     return collected
 
@@ -141,6 +131,13 @@ def get_only_skill_section_text(chunks: List[Dict[str, Any]]) -> str:
 
 
 
+def split_skill_text(text: str) -> List[str]:
+    if not text:
+        return []
+    parts = re.split(r"[,\n]+", text)
+    return [p.strip() for p in parts if p.strip()]
+
+
 def extract_skill_lists(resume_chunks, jd_chunks):
 
     def get_skill_text(chunks):
@@ -152,14 +149,8 @@ def extract_skill_lists(resume_chunks, jd_chunks):
     resume_skill_text = get_skill_text(resume_chunks)
     jd_skill_text = get_skill_text(jd_chunks)
 
-    def to_list(text):
-        if not text:
-            return []
-        parts = re.split(r"[,\n]+", text)
-        return [p.strip() for p in parts if p.strip()]
-
-    resume_skill_list = to_list(resume_skill_text)
-    jd_skill_list = to_list(jd_skill_text)
+    resume_skill_list = split_skill_text(resume_skill_text)
+    jd_skill_list = split_skill_text(jd_skill_text)
 
 
     print("\n===== RESUME SKILL LIST =====")
@@ -175,18 +166,13 @@ def extract_skill_lists(resume_chunks, jd_chunks):
     }
 
 
-def generate_gap_analysis_with_llm(
-    *,
+def _gap_analysis_prompt(
     similarity: float,
     match_score: float,
     resume_chunks: List[Dict[str, Any]],
     jd_chunks: List[Dict[str, Any]],
-    model_name: str = "llama-3.1-8b-instant",
 ) -> str:
-
-    client = get_groq_client()
-
-    prompt = f"""
+    return f"""
 You are an ATS-grade AI Job Readiness Assistant.
 
 You will receive:
@@ -214,6 +200,20 @@ Your Task:
 5. Keep the output in clear paragraphs and bullet points. Do NOT output JSON.
 """
 
+
+def generate_gap_analysis_with_llm(
+    *,
+    similarity: float,
+    match_score: float,
+    resume_chunks: List[Dict[str, Any]],
+    jd_chunks: List[Dict[str, Any]],
+    model_name: str = "llama-3.1-8b-instant",
+) -> str:
+
+    client = get_groq_client()
+
+    prompt = _gap_analysis_prompt(similarity, match_score, resume_chunks, jd_chunks)
+
     resp = client.chat.completions.create(
         model=model_name,
         messages=[{"role": "user", "content": prompt}],
@@ -224,6 +224,34 @@ Your Task:
     return resp.choices[0].message.content.strip()
 
 
+def stream_gap_analysis_with_llm(
+    *,
+    similarity: float,
+    match_score: float,
+    resume_chunks: List[Dict[str, Any]],
+    jd_chunks: List[Dict[str, Any]],
+    model_name: str = "llama-3.1-8b-instant",
+) -> Iterator[str]:
+    """Same as generate_gap_analysis_with_llm, yielding text as it is generated."""
+
+    client = get_groq_client()
+
+    prompt = _gap_analysis_prompt(similarity, match_score, resume_chunks, jd_chunks)
+
+    stream = client.chat.completions.create(
+        model=model_name,
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=700,
+        temperature=0.3,
+        stream=True,
+    )
+
+    for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            yield delta
+
+
 
 def compare_skill_lists_pure(resume_skill_list, jd_skill_list):
 
@@ -258,7 +286,9 @@ def compare_skill_lists_pure(resume_skill_list, jd_skill_list):
     }
 
 
-def run_gap_analysis(resume_db: Chroma, jd_db: Chroma) -> Dict[str, Any]:
+def _document_similarity(resume_db: Chroma, jd_db: Chroma):
+    if SIMILARITY_MODE == "chunk":
+        return compute_chunk_similarity_score(resume_db, jd_db)
 
     resume_docs = resume_db._collection.get().get("documents", []) if resume_db else []
     jd_docs = jd_db._collection.get().get("documents", []) if jd_db else []
@@ -266,17 +296,21 @@ def run_gap_analysis(resume_db: Chroma, jd_db: Chroma) -> Dict[str, Any]:
     resume_raw = "\n".join(resume_docs)
     jd_raw = "\n".join(jd_docs)
 
-    similarity, match_score = compute_similarity_score(resume_raw, jd_raw)
+    return compute_similarity_score(resume_raw, jd_raw)
 
-    resume_chunks = _retrieve_weighted_resume_context(resume_db)
-    jd_chunks = _retrieve_weighted_jd_context(jd_db)
 
-    llm_output = generate_gap_analysis_with_llm(
-        similarity=similarity,
-        match_score=match_score,
-        resume_chunks=resume_chunks,
-        jd_chunks=jd_chunks,
-    )
+def run_gap_retrieval(resume_db: Chroma, jd_db: Chroma) -> Dict[str, Any]:
+    """Everything in run_gap_analysis except the LLM narrative."""
+
+    # Similarity scoring and every section retrieval are independent, so they
+    # are all submitted up front and the request waits on the slowest branch.
+    similarity_future = _executor.submit(_document_similarity, resume_db, jd_db)
+    resume_futures = _submit_retrievals(resume_db, RESUME_RETRIEVALS) if resume_db else None
+    jd_futures = _submit_jd_retrievals(jd_db) if jd_db else None
+
+    resume_chunks = _retrieve_weighted_resume_context(resume_db, resume_futures)
+    jd_chunks = _retrieve_weighted_jd_context(jd_db, jd_futures)
+    similarity, match_score = similarity_future.result()
 
     skill_lists = extract_skill_lists(resume_chunks, jd_chunks)
 
@@ -292,5 +326,18 @@ def run_gap_analysis(resume_db: Chroma, jd_db: Chroma) -> Dict[str, Any]:
         "skills": skills,
         "resume_retrieved_chunks": resume_chunks,
         "jd_retrieved_chunks": jd_chunks,
-        "llm_analysis": llm_output,
     }
+
+
+def run_gap_analysis(resume_db: Chroma, jd_db: Chroma) -> Dict[str, Any]:
+
+    result = run_gap_retrieval(resume_db, jd_db)
+
+    result["llm_analysis"] = generate_gap_analysis_with_llm(
+        similarity=result["similarity_score"],
+        match_score=result["match_score_0_10"],
+        resume_chunks=result["resume_retrieved_chunks"],
+        jd_chunks=result["jd_retrieved_chunks"],
+    )
+
+    return result
@@ -1,14 +1,6 @@
 
 
-from groq import Groq
-import os
-
-
-def get_groq_client():
-    api_key = os.environ.get("GROQ_API_KEY")
-    if not api_key:
-        raise RuntimeError("❌ GROQ_API_KEY not set.")
-    return Groq(api_key=api_key)
+from llm_client import get_groq_client
 
 
 def rewrite_query(history: list, user_message: str) -> str:
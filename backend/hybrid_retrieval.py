@@ -1,29 +1,79 @@
 
 
-from typing import List, Dict, Optional
-from rank_bm25 import BM25Okapi
+import os
+from typing import List, Dict, Optional, Tuple
 from langchain_chroma import Chroma
 
 from reranker import rerank  
-
-def _get_filtered_corpus(db: Chroma, section_filter: Optional[str] = None):
-    raw = db._collection.get()
-    docs = raw.get("documents", [])
-    metas = raw.get("metadatas", [{} for _ in docs])
-
-    valid_indices = [
-        i for i in range(len(docs))
-        if section_filter is None or metas[i].get("section") == section_filter
-    ]
-
-    corpus_texts = [docs[i] for i in valid_indices]
-    corpus_metas = [metas[i] for i in valid_indices]
-
-    return corpus_texts, corpus_metas
-
-def _build_bm25(corpus_texts: List[str]) -> BM25Okapi:
-    tokens = [doc.lower().split() for doc in corpus_texts]
-    return BM25Okapi(tokens)
+from bm25_index import get_index
+from dense_index import embed_query_cached, get_dense_index
+
+# How BM25 and vector candidates are combined before reranking:
+# rrf: reciprocal rank fusion (scale-free, default)
+# weighted: min-max normalized scores, FUSION_BM25_WEIGHT for BM25 and the rest for vectors
+# concat: BM25 list followed by vector list (original behaviour)
+FUSION_METHODS = ("rrf", "weighted", "concat")
+FUSION_METHOD = os.getenv("FUSION_METHOD", "rrf").lower()
+if FUSION_METHOD not in FUSION_METHODS:
+    raise ValueError(f"Unknown FUSION_METHOD '{FUSION_METHOD}', expected one of {FUSION_METHODS}")
+RRF_K = int(os.getenv("RRF_K", "60"))
+FUSION_BM25_WEIGHT = float(os.getenv("FUSION_BM25_WEIGHT", "0.4"))
+# Fused candidates passed to the reranker; 0 keeps the default of 2 * top_k.
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "0"))
+
+# (chunk_id, text, metadata, score)
+Candidate = Tuple[str, str, Dict, float]
+
+
+def _rrf_scores(ranked_lists: List[List[Candidate]], k: int = RRF_K) -> Dict[str, float]:
+    scores: Dict[str, float] = {}
+    for ranked in ranked_lists:
+        for rank, (chunk_id, _, _, _) in enumerate(ranked):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (k + rank + 1)
+    return scores
+
+
+def _minmax(ranked: List[Candidate]) -> Dict[str, float]:
+    if not ranked:
+        return {}
+    values = [c[3] for c in ranked]
+    lo, hi = min(values), max(values)
+    span = hi - lo
+    return {c[0]: (c[3] - lo) / span if span > 0 else 1.0 for c in ranked}
+
+
+def _weighted_scores(bm25_ranked: List[Candidate], vec_ranked: List[Candidate], bm25_weight: float) -> Dict[str, float]:
+    bm25_norm = _minmax(bm25_ranked)
+    vec_norm = _minmax(vec_ranked)
+    return {
+        chunk_id: bm25_weight * bm25_norm.get(chunk_id, 0.0) + (1 - bm25_weight) * vec_norm.get(chunk_id, 0.0)
+        for chunk_id in set(bm25_norm) | set(vec_norm)
+    }
+
+
+def fuse_candidates(
+    bm25_ranked: List[Candidate],
+    vec_ranked: List[Candidate],
+    method: str = FUSION_METHOD,
+) -> List[Candidate]:
+    """Merge both candidate lists into one list, best first, unique by chunk ID."""
+    if method not in FUSION_METHODS:
+        raise ValueError(f"Unknown fusion method '{method}', expected one of {FUSION_METHODS}")
+
+    by_id: Dict[str, Candidate] = {}
+    for c in bm25_ranked + vec_ranked:
+        by_id.setdefault(c[0], c)
+
+    if method == "concat":
+        return list(by_id.values())
+
+    if method == "rrf":
+        fused = _rrf_scores([bm25_ranked, vec_ranked])
+    else:
+        fused = _weighted_scores(bm25_ranked, vec_ranked, FUSION_BM25_WEIGHT)
+
+    ordered = sorted(fused.items(), key=lambda kv: kv[1], reverse=True)
+    return [(cid, by_id[cid][1], by_id[cid][2], score) for cid, score in ordered]
 
 def hybrid_search(
     search_query: str,
@@ -33,70 +83,73 @@ def hybrid_search(
     vec_k: int = 20,
     use_rerank: bool = True,
     section_filter: Optional[str] = None,
+    fusion: Optional[str] = None,
+    rerank_candidates: Optional[int] = None,
 ) -> List[Dict]:
 
     if db is None:
         return []
 
-    corpus_texts, corpus_metas = _get_filtered_corpus(db, section_filter)
-    if not corpus_texts:
+    index = get_index(db).section(section_filter)
+    if index is None or not index.texts:
         return []
 
-    bm25 = _build_bm25(corpus_texts)
-    query_tokens = search_query.lower().split()
-    bm25_scores = bm25.get_scores(query_tokens)
+    bm25_scores = index.get_scores(search_query)
 
     bm25_ranked = sorted(
-        zip(corpus_texts, corpus_metas, bm25_scores),
-        key=lambda x: x[2],
+        zip(index.ids, index.texts, index.metas, (float(x) for x in bm25_scores)),
+        key=lambda x: x[3],
         reverse=True
     )[:bm25_k]
 
-    filter_dict = {"section": section_filter} if section_filter else None
-
-    try:
-        vec_docs = db.similarity_search_with_score(search_query, k=vec_k, filter=filter_dict)
-        vec_ranked = [(d.page_content, d.metadata, float(score)) for (d, score) in vec_docs]
-    except:
-        vec_ranked = []
-
-
-    candidates = bm25_ranked + vec_ranked
-
-    seen = set()
-    unique = []
-    for text, meta, score in candidates:
-        if text not in seen:
-            seen.add(text)
-            unique.append((text, meta, score))
-
-    candidate_texts = [u[0] for u in unique[: max(top_k * 2, top_k)]]
+    dense = get_dense_index(db)
+    if dense.texts:
+        query_vec = embed_query_cached(search_query)
+        vec_ranked = [
+            (dense.ids[row], dense.texts[row], dense.metas[row], score)
+            for row, score in dense.search(query_vec, vec_k, section_filter)
+        ]
+    else:
+        filter_dict = {"section": section_filter} if section_filter else None
+
+        try:
+            # Relevance scores are higher-is-better, like the dense index scores.
+            vec_docs = db.similarity_search_with_relevance_scores(search_query, k=vec_k, filter=filter_dict)
+            vec_ranked = [
+                (d.id or d.page_content, d.page_content, d.metadata, float(score))
+                for (d, score) in vec_docs
+            ]
+        except:
+            vec_ranked = []
+
+
+    candidates = fuse_candidates(bm25_ranked, vec_ranked, fusion or FUSION_METHOD)
 
     if use_rerank:
-        reranked_items = rerank(search_query, candidate_texts, top_k)
+        shortlist = candidates[: rerank_candidates or RERANK_CANDIDATES or max(top_k * 2, top_k)]
+        reranked_items = rerank(search_query, [c[1] for c in shortlist], top_k)
 
         results = []
         for item in reranked_items:
-            text = item["text"]
-            score = item["score"]
-
-            meta = next((m for t, m, s in unique if t == text), {})
+            chunk_id, text, meta, _ = shortlist[item["index"]]
 
             results.append({
+                "id": chunk_id,
                 "text": text,
                 "metadata": meta,
                 "section": meta.get("section"),
-                "reranker_score": score  
+                "reranker_score": item["score"]  
             })
 
         return results
 
     results = []
-    for text, meta, score in unique[:top_k]:
+    for chunk_id, text, meta, score in candidates[:top_k]:
         results.append({
+            "id": chunk_id,
             "text": text,
             "metadata": meta,
             "section": meta.get("section"),
-            "bm25_or_vec_score": score,
+            "fusion_score": score,
         })
     return results
@@ -0,0 +1,83 @@
+"""
+Content-hash cache of ingested documents.
+
+Resumes and JDs are often re-submitted unchanged, so the collection built
+for a document is kept and reused when the same cleaned text (for the same
+document type and embedding model) comes in again. The cache holds a
+reference on each cached collection (see collection_registry) and releases
+it when the entry is evicted. Callers get their own reference as well and
+must release it (or hand it to a session) when they are done.
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, Tuple
+
+from langchain_chroma import Chroma
+
+from collection_registry import acquire_collection, release_collection
+from model_registry import EMBED_MODEL
+
+INGEST_CACHE_SIZE = int(os.getenv("INGEST_CACHE_SIZE", "128"))
+
+# key -> (collection, chunk count)
+_cache: "OrderedDict[str, Tuple[Chroma, int]]" = OrderedDict()
+_lock = Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def content_key(doc_type: str, clean_text: str) -> str:
+    h = hashlib.sha256()
+    for part in (EMBED_MODEL, doc_type, clean_text):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def get_or_build(key: str, build: Callable[[], Tuple[Chroma, int]]) -> Tuple[Chroma, int, bool]:
+    """
+    Return (collection, chunk count, cache hit) for a document, calling
+    build() only when it is not cached yet. The returned collection is
+    acquired on behalf of the caller.
+    """
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            acquire_collection(entry[0])
+            return entry[0], entry[1], True
+        _stats["misses"] += 1
+
+    db, chunk_count = build()
+
+    evicted = []
+    with _lock:
+        existing = _cache.get(key)
+        if existing is not None:
+            acquire_collection(existing[0])
+        else:
+            # One reference for the cache, one for the caller.
+            acquire_collection(db)
+            acquire_collection(db)
+            _cache[key] = (db, chunk_count)
+            while len(_cache) > INGEST_CACHE_SIZE:
+                _, old = _cache.popitem(last=False)
+                evicted.append(old[0])
+                _stats["evictions"] += 1
+
+    if existing is not None:
+        # Another request built the same document concurrently; keep theirs.
+        release_collection(db)
+        return existing[0], existing[1], True
+
+    for old_db in evicted:
+        release_collection(old_db)
+    return db, chunk_count, False
+
+
+def ingest_cache_stats() -> Dict[str, int]:
+    with _lock:
+        return {"entries": len(_cache), "max_entries": INGEST_CACHE_SIZE, **_stats}
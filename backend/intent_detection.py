@@ -1,6 +1,7 @@
 from enum import Enum
 from groq import Groq
-import os
+
+from llm_client import get_groq_client
 
 
 class QueryTarget(str, Enum):
@@ -10,10 +11,7 @@ class QueryTarget(str, Enum):
 
 
 def _get_groq_client() -> Groq:
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        raise RuntimeError("GROQ_API_KEY not set")
-    return Groq(api_key=api_key)
+    return get_groq_client()
 
 
 def target_for_retrieval(query: str) -> QueryTarget:
@@ -0,0 +1,353 @@
+"""
+Persistent, shared JD library.
+
+JDs are stored once under an ID in JD_LIBRARY_DIR:
+
+- library.json: embedding model and dimension the library was built with
+- jds.jsonl: one record per JD (ID, title, cleaned text, content hash, the
+  range of its embedding rows and the byte range of its chunk lines)
+- chunks.jsonl: one line per chunk row with its ID, text and metadata
+- embeddings.f32: float32 chunk embeddings, EMBED_DIM per row, memory-mapped
+
+Only a small index (ID -> record offset, hash -> ID) is kept in memory;
+records and chunks are read from disk when a JD is used, so the library
+can hold far more JDs than fit in memory as Python objects.
+
+/analyze can reference a library JD by ID, and an uploaded JD whose cleaned
+text is already in the library reuses the stored chunks and embeddings
+(see resume_jd_rag), so a JD is embedded once no matter how many
+applicants analyze against it.
+
+Files are append-only and a JD record is written after its chunks, so rows
+left behind by an interrupted write have no record and are truncated by
+the next writer. Appends and truncation hold an exclusive flock on
+library.lock, so several server workers and bulk_ingest can share one
+library; each process picks up records appended by the others the next
+time it reads the library.
+"""
+
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from model_registry import EMBED_DIM, EMBED_MODEL, get_embedder
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+JD_LIBRARY_DIR = os.getenv("JD_LIBRARY_DIR", "jd_library")
+
+ROW_BYTES = EMBED_DIM * 4
+
+# (jd_id, title, cleaned text, [(chunk text, metadata)], chunk embeddings)
+LibraryEntry = Tuple[str, str, str, List[Tuple[str, Dict]], "np.ndarray"]
+
+
+def text_hash(clean_text: str) -> str:
+    return hashlib.sha256(clean_text.encode("utf-8")).hexdigest()
+
+
+def _size(path: str) -> int:
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+class JDLibrary:
+    def __init__(self, path: str):
+        self.path = path
+        self.jd_ids: List[str] = []
+        self.by_hash: Dict[str, str] = {}
+        self._offsets: Dict[str, int] = {}  # jd_id -> byte offset of its record in jds.jsonl
+        self._jds_read = 0  # bytes of jds.jsonl already indexed
+        self.n_rows = 0
+        self._chunks_end = 0
+        self.embeddings = np.zeros((0, EMBED_DIM), dtype=np.float32)
+        self._lock = Lock()
+        self._load()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    @contextmanager
+    def file_lock(self, exclusive: bool = True):
+        """
+        flock on library.lock. Not reentrant: while holding it, don't call
+        methods that read the library (they take a shared lock).
+        """
+        with open(self._file("library.lock"), "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+
+    def _check_model(self):
+        meta_path = self._file("library.json")
+        if not os.path.exists(meta_path):
+            tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"embed_model": EMBED_MODEL, "embed_dim": EMBED_DIM}, f)
+            os.replace(tmp_path, meta_path)
+            return
+
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("embed_model") != EMBED_MODEL or meta.get("embed_dim") != EMBED_DIM:
+            raise RuntimeError(
+                f"❌ JD library {self.path} was built with {meta.get('embed_model')}, "
+                f"but EMBED_MODEL is {EMBED_MODEL}. Rebuild it or point JD_LIBRARY_DIR elsewhere."
+            )
+
+    def _load(self):
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock, self.file_lock():
+            self._check_model()
+            self._read_new_records(exclusive=True)
+            self._truncate_uncommitted()
+        print(f"📚 JD library {self.path}: {len(self.jd_ids)} JDs, {self.n_rows} chunks")
+
+    def _read_new_records(self, exclusive: bool):
+        """Index records appended to jds.jsonl since the last read. Caller holds both locks."""
+        path = self._file("jds.jsonl")
+        if _size(path) == self._jds_read:
+            return
+
+        with open(path, "r+b" if exclusive else "rb") as f:
+            f.seek(self._jds_read)
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    # Only an interrupted write leaves a partial line.
+                    if line and exclusive:
+                        f.truncate(offset)
+                    break
+                self._jds_read = f.tell()
+                if not line.strip():
+                    continue
+                self._index_record(json.loads(line), offset)
+
+        self._map_embeddings()
+
+    def _index_record(self, record: Dict, offset: int):
+        jd_id = record["jd_id"]
+        self.jd_ids.append(jd_id)
+        self._offsets[jd_id] = offset
+        self.by_hash[record["hash"]] = jd_id
+        self.n_rows = max(self.n_rows, record["row_start"] + record["row_count"])
+        self._chunks_end = max(self._chunks_end, record["chunk_end"])
+
+    def _truncate_uncommitted(self):
+        """Drop chunk / embedding rows without a record. Caller holds the exclusive file lock."""
+        for name, size in (("chunks.jsonl", self._chunks_end), ("embeddings.f32", self.n_rows * ROW_BYTES)):
+            path = self._file(name)
+            if _size(path) > size:
+                os.truncate(path, size)
+
+    def _map_embeddings(self):
+        if self.n_rows:
+            self.embeddings = np.memmap(
+                self._file("embeddings.f32"), dtype=np.float32, mode="r", shape=(self.n_rows, EMBED_DIM)
+            )
+        else:
+            self.embeddings = np.zeros((0, EMBED_DIM), dtype=np.float32)
+
+    def _sync(self):
+        # A stat per call; records written by other processes are read only when the file grew.
+        if _size(self._file("jds.jsonl")) == self._jds_read:
+            return
+        with self._lock, self.file_lock(exclusive=False):
+            self._read_new_records(exclusive=False)
+
+    def _read_record(self, offset: int) -> Dict:
+        with open(self._file("jds.jsonl"), "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def get(self, jd_id: str) -> Optional[Dict]:
+        self._sync()
+        offset = self._offsets.get(jd_id)
+        return self._read_record(offset) if offset is not None else None
+
+    def find_by_text(self, clean_text: str) -> Optional[Dict]:
+        self._sync()
+        jd_id = self.by_hash.get(text_hash(clean_text))
+        return self.get(jd_id) if jd_id else None
+
+    def list_ids(self) -> List[str]:
+        """All JD IDs in the order they were added."""
+        self._sync()
+        return list(self.jd_ids)
+
+    def rows(self, record: Dict):
+        """(chunk ids, texts, metadatas, embeddings) of one JD, read from disk."""
+        ids, texts, metas = [], [], []
+        with open(self._file("chunks.jsonl"), "rb") as f:
+            f.seek(record["chunk_offset"])
+            for _ in range(record["row_count"]):
+                chunk = json.loads(f.readline())
+                ids.append(chunk["id"])
+                texts.append(chunk["text"])
+                metas.append(chunk["meta"])
+
+        start, stop = record["row_start"], record["row_start"] + record["row_count"]
+        if stop > len(self.embeddings):
+            self._sync()
+        return ids, texts, metas, np.asarray(self.embeddings[start:stop])
+
+    def add(self, entries: List[LibraryEntry]) -> List[Tuple[Dict, bool]]:
+        """
+        Append JDs with their chunks and embeddings. Returns (record, created)
+        per entry; a JD whose text is already stored returns the existing
+        record instead of being added twice.
+        """
+        results: List[Tuple[Dict, bool]] = []
+        with self._lock, self.file_lock():
+            # Other processes may have appended since this one last read.
+            self._read_new_records(exclusive=True)
+            self._truncate_uncommitted()
+
+            paths = [self._file(n) for n in ("embeddings.f32", "chunks.jsonl", "jds.jsonl")]
+            sizes = [_size(p) for p in paths]
+            row, chunk_pos, record_pos = sizes[0] // ROW_BYTES, sizes[1], sizes[2]
+
+            new_records: Dict[str, Tuple[Dict, int]] = {}
+            new_by_hash: Dict[str, str] = {}
+            chunk_lines, record_lines, vectors = [], [], []
+
+            for jd_id, title, clean_text, chunks, embeddings in entries:
+                h = text_hash(clean_text)
+                existing = self.by_hash.get(h) or new_by_hash.get(h)
+                if existing:
+                    results.append((
+                        new_records[existing][0] if existing in new_records
+                        else self._read_record(self._offsets[existing]),
+                        False,
+                    ))
+                    continue
+                if jd_id in self._offsets or jd_id in new_records:
+                    raise ValueError(f"JD ID '{jd_id}' already exists with different text")
+
+                lines = [
+                    (json.dumps({"id": f"{jd_id}:{i}", "text": text, "meta": {**meta, "jd_id": jd_id}},
+                                ensure_ascii=False) + "\n").encode("utf-8")
+                    for i, (text, meta) in enumerate(chunks)
+                ]
+                record = {
+                    "jd_id": jd_id,
+                    "title": title,
+                    "hash": h,
+                    "text": clean_text,
+                    "row_start": row,
+                    "row_count": len(chunks),
+                    "chunk_offset": chunk_pos,
+                    "chunk_end": chunk_pos + sum(len(line) for line in lines),
+                    "created_at": time.time(),
+                }
+                record_line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+                chunk_lines.extend(lines)
+                record_lines.append(record_line)
+                if chunks:
+                    vectors.append(np.asarray(embeddings, dtype=np.float32).reshape(len(chunks), EMBED_DIM))
+
+                new_records[jd_id] = (record, record_pos)
+                new_by_hash[h] = jd_id
+                row += len(chunks)
+                chunk_pos = record["chunk_end"]
+                record_pos += len(record_line)
+                results.append((record, True))
+
+            if not new_records:
+                return results
+
+            # Chunks and embeddings first, records last: a record on disk
+            # always has its rows. A failed write is rolled back so row
+            # numbers stay aligned with the files.
+            try:
+                for path, data in zip(paths, ([v.tobytes() for v in vectors], chunk_lines, record_lines)):
+                    with open(path, "ab") as f:
+                        f.writelines(data)
+            except Exception:
+                for path, size in zip(paths, sizes):
+                    if os.path.exists(path):
+                        os.truncate(path, size)
+                raise
+
+            for record, offset in new_records.values():
+                self._index_record(record, offset)
+            self._jds_read = record_pos
+            self._map_embeddings()
+
+        return results
+
+    def list_jds(self, offset: int = 0, limit: int = 50) -> List[Dict]:
+        self._sync()
+        records = [self._read_record(self._offsets[jd_id]) for jd_id in self.jd_ids[offset: offset + limit]]
+        return [
+            {"jd_id": r["jd_id"], "title": r["title"], "chunks": r["row_count"], "created_at": r["created_at"]}
+            for r in records
+        ]
+
+    def stats(self) -> Dict:
+        self._sync()
+        return {
+            "path": self.path,
+            "jds": len(self.jd_ids),
+            "chunks": self.n_rows,
+            "embedding_mb": round(self.n_rows * ROW_BYTES / (1024 * 1024), 1),
+        }
+
+
+_library: Optional[JDLibrary] = None
+_lock = Lock()
+
+
+def get_library() -> JDLibrary:
+    global _library
+    if _library is None:
+        with _lock:
+            if _library is None:
+                _library = JDLibrary(JD_LIBRARY_DIR)
+    return _library
+
+
+def library_exists() -> bool:
+    # Lookups must not create an empty library directory as a side effect.
+    return _library is not None or os.path.exists(os.path.join(JD_LIBRARY_DIR, "jds.jsonl"))
+
+
+def find_library_jd(clean_text: str) -> Optional[Dict]:
+    """Library record with exactly this cleaned text, if any."""
+    return get_library().find_by_text(clean_text) if library_exists() else None
+
+
+def get_library_jd(jd_id: str) -> Optional[Dict]:
+    return get_library().get(jd_id) if library_exists() else None
+
+
+def add_jd(text: str, title: str = "", jd_id: Optional[str] = None) -> Tuple[Dict, bool]:
+    """Clean, chunk and embed one JD and store it; returns (record, created)."""
+    # resume_jd_rag imports this module to look up library JDs.
+    from resume_jd_rag import basic_clean, chunk_document
+
+    clean = basic_clean(text)
+    library = get_library()
+    existing = library.find_by_text(clean)
+    if existing:
+        return existing, False
+
+    chunks = chunk_document(clean, "jd")
+    embeddings = get_embedder().embed_documents([t for t, _ in chunks]) if chunks else []
+    return library.add([(jd_id or text_hash(clean)[:16], title, clean, chunks, embeddings)])[0]
+
+
+def library_stats() -> Dict:
+    if _library is None:
+        return {"loaded": False}
+    return {"loaded": True, **_library.stats()}
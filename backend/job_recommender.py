@@ -0,0 +1,371 @@
+"""
+Reverse matching: the best-fitting library JDs for a resume.
+
+Stage 1 (recall): every library JD gets one vector, the JD_SECTION_WEIGHTS
+weighted sum of its per-section centroid embeddings. JD sections come from
+the headings found at chunking time (resume_jd_rag.classify_jd_heading), so
+requirements and skills chunks dominate; a JD with no recognised headings
+is all "other" and its vector is a plain centroid. The resume gets the same
+treatment with RESUME_SECTION_WEIGHTS, and the nearest JD vectors are found
+with an HNSW index (hnswlib, optional) or an exact NumPy scan for small
+libraries.
+
+Stage 2 (precision): the candidates' stored chunks and vectors are scored
+in memory, with no Chroma collection, against the resume's skills /
+experience / projects as queries. Dense and BM25 scores are fused and only
+the best RECOMMEND_CHUNKS_PER_JD chunks of each JD, at most
+RECOMMEND_MAX_RERANK_PAIRS pairs in total, go to the cross-encoder; each JD
+is scored by its best reranked chunks.
+
+JD vectors and the HNSW index are kept next to the library
+(jd_vectors.f32, jd_ann.hnsw) and only new JDs are added on refresh.
+"""
+
+import os
+import time
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from bm25_index import SectionIndex
+from collection_registry import release_collection
+from dense_index import embed_query_cached, get_dense_index
+from hybrid_retrieval import fuse_candidates
+from jd_library import ROW_BYTES, get_library, library_exists
+from model_registry import EMBED_DIM
+from reranker import rerank
+from resume_jd_rag import get_resume_store
+from similarity_score import DEFAULT_SECTION_WEIGHT, JD_SECTION_WEIGHTS
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+# JDs passed from the vector stage to the fused search / rerank.
+RECOMMEND_CANDIDATES = int(os.getenv("RECOMMEND_CANDIDATES", "20"))
+# Hard ceiling on candidates (and results).
+RECOMMEND_MAX_CANDIDATES = int(os.getenv("RECOMMEND_MAX_CANDIDATES", "100"))
+# Best fused chunks of each candidate JD reranked per query.
+RECOMMEND_CHUNKS_PER_JD = int(os.getenv("RECOMMEND_CHUNKS_PER_JD", "3"))
+# Cross-encoder pairs per request, split evenly across the queries.
+RECOMMEND_MAX_RERANK_PAIRS = int(os.getenv("RECOMMEND_MAX_RERANK_PAIRS", "300"))
+# auto: HNSW once the library has RECOMMEND_ANN_MIN_JDS JDs (and hnswlib is
+# installed), exact NumPy scan below that; hnsw / exact force one or the other.
+RECOMMEND_ANN = os.getenv("RECOMMEND_ANN", "auto").lower()
+RECOMMEND_ANN_MIN_JDS = int(os.getenv("RECOMMEND_ANN_MIN_JDS", "20000"))
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "200"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "128"))
+
+RESUME_SECTION_WEIGHTS = {
+    "skills": 3.0,
+    "experience": 2.0,
+    "projects": 2.0,
+    "summary": 1.0,
+    "other": 1.0,
+    "achievements": 0.5,
+    "education": 0.5,
+}
+
+# (resume section, weight) used as stage 2 queries.
+RERANK_QUERY_SECTIONS = [("skills", 3.0), ("experience", 2.0), ("projects", 1.0)]
+RERANK_QUERY_CHARS = 300
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    return matrix / (np.linalg.norm(matrix, axis=-1, keepdims=True) + 1e-12)
+
+
+def weighted_section_vector(embeddings: np.ndarray, sections: List[str], weights: Dict[str, float]) -> np.ndarray:
+    """Normalized sum of per-section centroids, each scaled by its section weight."""
+    vec = np.zeros(EMBED_DIM, dtype=np.float32)
+    if len(embeddings) == 0:
+        return vec
+
+    embeddings = _normalize(np.asarray(embeddings, dtype=np.float32))
+    sections_arr = np.array(sections, dtype=object)
+    for section in set(sections):
+        centroid = _normalize(embeddings[sections_arr == section].mean(axis=0))
+        vec += weights.get(section, DEFAULT_SECTION_WEIGHT) * centroid
+    return _normalize(vec)
+
+
+class JobIndex:
+    """One vector per JD, searched exactly or through HNSW."""
+
+    def __init__(self, backend: str = RECOMMEND_ANN, ann_path: Optional[str] = None):
+        self.backend = backend
+        self.ann_path = ann_path
+        self.jd_ids: List[str] = []
+        self.vectors = np.zeros((0, EMBED_DIM), dtype=np.float32)
+        self._ann = None
+        self._lock = Lock()
+
+    def add(self, jd_ids: List[str], vectors: np.ndarray):
+        if not jd_ids:
+            return
+        with self._lock:
+            self.jd_ids = self.jd_ids + list(jd_ids)
+            self.vectors = np.vstack([self.vectors, np.asarray(vectors, dtype=np.float32)])
+
+    def uses_ann(self) -> bool:
+        if hnswlib is None or self.backend == "exact":
+            return False
+        return self.backend == "hnsw" or len(self.jd_ids) >= RECOMMEND_ANN_MIN_JDS
+
+    def _ensure_ann(self):
+        n = len(self.jd_ids)
+        if self._ann is None:
+            ann = hnswlib.Index(space="ip", dim=EMBED_DIM)
+            if self.ann_path and os.path.exists(self.ann_path):
+                ann.load_index(self.ann_path, max_elements=n)
+                if ann.get_current_count() > n:
+                    # Index is ahead of the vectors (e.g. library truncated); rebuild.
+                    ann = hnswlib.Index(space="ip", dim=EMBED_DIM)
+                    ann.init_index(max_elements=n, ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+            else:
+                ann.init_index(max_elements=n, ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+            self._ann = ann
+
+        done = self._ann.get_current_count()
+        if done < n:
+            self._ann.resize_index(n)
+            self._ann.add_items(self.vectors[done:n], np.arange(done, n))
+            if self.ann_path:
+                # Replaced atomically: other workers may be loading it.
+                tmp_path = f"{self.ann_path}.{os.getpid()}.tmp"
+                self._ann.save_index(tmp_path)
+                os.replace(tmp_path, self.ann_path)
+
+    def search(self, query_vec: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        n = len(self.jd_ids)
+        k = min(k, n)
+        if k == 0:
+            return []
+
+        if self.uses_ann():
+            # hnswlib does not allow queries while items are being added.
+            with self._lock:
+                self._ensure_ann()
+                self._ann.set_ef(max(HNSW_EF_SEARCH, k))
+                labels, distances = self._ann.knn_query(query_vec.reshape(1, -1), k=k)
+            return [(self.jd_ids[int(i)], float(1 - d)) for i, d in zip(labels[0], distances[0])]
+
+        scores = self.vectors @ query_vec
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.jd_ids[int(i)], float(scores[i])) for i in top]
+
+
+def _jd_vector(library, record: Dict) -> np.ndarray:
+    _, _, metas, embeddings = library.rows(record)
+    return weighted_section_vector(embeddings, [m.get("section", "other") for m in metas], JD_SECTION_WEIGHTS)
+
+
+_index: Optional[JobIndex] = None
+_index_lock = Lock()
+
+
+def _stored_rows(vectors_path: str) -> int:
+    """Complete rows in jd_vectors.f32, dropping a partial row. Caller holds the library file lock."""
+    if not os.path.exists(vectors_path):
+        return 0
+    size = os.path.getsize(vectors_path)
+    if size % ROW_BYTES:
+        os.truncate(vectors_path, size - size % ROW_BYTES)
+    return size // ROW_BYTES
+
+
+def refresh_job_index() -> JobIndex:
+    """
+    Bring the job index up to date with the JD library, computing vectors
+    only for new JDs. jd_vectors.f32 follows the library's JD order, so
+    server workers share it: each one reads the rows others already wrote.
+    """
+    global _index
+    library = get_library()
+
+    with _index_lock:
+        if _index is None:
+            _index = JobIndex(ann_path=os.path.join(library.path, "jd_ann.hnsw"))
+
+        jd_ids = library.list_ids()
+        n = len(jd_ids)
+        if n == len(_index.jd_ids):
+            return _index
+
+        vectors_path = os.path.join(library.path, "jd_vectors.f32")
+        with library.file_lock():
+            start, stop = len(_index.jd_ids), min(_stored_rows(vectors_path), n)
+            if stop > start:
+                saved = np.fromfile(
+                    vectors_path, dtype=np.float32, count=(stop - start) * EMBED_DIM, offset=start * ROW_BYTES
+                )
+                _index.add(jd_ids[start:stop], saved.reshape(stop - start, EMBED_DIM))
+
+        start = len(_index.jd_ids)
+        new = jd_ids[start:]
+        if new:
+            # Reads the library, so not under its file lock.
+            vectors = np.stack([_jd_vector(library, library.get(jd_id)) for jd_id in new]).astype(np.float32)
+            with library.file_lock():
+                stored = _stored_rows(vectors_path)
+                if stored < n:
+                    rows = vectors[stored - start:] if stored >= start else np.vstack([_index.vectors[stored:], vectors])
+                    with open(vectors_path, "ab") as f:
+                        f.write(rows.tobytes())
+            _index.add(new, vectors)
+            print(f"🧭 Job index: +{len(new)} JDs ({len(_index.jd_ids)} total)")
+
+        return _index
+
+
+def _resume_queries(texts: List[str], sections: List[str]) -> List[Tuple[str, float]]:
+    queries = []
+    for section, weight in RERANK_QUERY_SECTIONS:
+        text = " ".join(t for t, s in zip(texts, sections) if s == section)
+        if text:
+            queries.append((text[:RERANK_QUERY_CHARS], weight))
+    if not queries and texts:
+        queries.append((" ".join(texts)[:RERANK_QUERY_CHARS], 1.0))
+    return queries
+
+
+def _sigmoid(x: float) -> float:
+    return float(1 / (1 + np.exp(-x)))
+
+
+def _candidate_chunks(records: List[Dict]):
+    """Stored chunks of the candidate JDs: BM25 index plus normalized embeddings, nothing embedded."""
+    library = get_library()
+    index = SectionIndex()
+    matrices = []
+    for record in records:
+        ids, texts, metas, embeddings = library.rows(record)
+        index.add(ids, texts, metas)
+        matrices.append(np.asarray(embeddings, dtype=np.float32))
+    matrix = _normalize(np.vstack(matrices)) if matrices else np.zeros((0, EMBED_DIM), dtype=np.float32)
+    return index, matrix
+
+
+def _shortlist(index: SectionIndex, matrix: np.ndarray, query: str, max_pairs: int) -> List[int]:
+    """Rows of the best fused chunks, at most RECOMMEND_CHUNKS_PER_JD per JD and max_pairs overall."""
+    dense_scores = matrix @ embed_query_cached(query)
+    bm25_scores = index.get_scores(query)
+    rows = [str(i) for i in range(len(index.texts))]
+
+    def ranked(scores) -> List:
+        return sorted(
+            ((rows[i], index.texts[i], index.metas[i], float(scores[i])) for i in range(len(rows))),
+            key=lambda c: c[3],
+            reverse=True,
+        )
+
+    per_jd: Dict[str, int] = {}
+    shortlist = []
+    for row, _, meta, _ in fuse_candidates(ranked(bm25_scores), ranked(dense_scores)):
+        jd_id = meta.get("jd_id")
+        if per_jd.get(jd_id, 0) >= RECOMMEND_CHUNKS_PER_JD:
+            continue
+        per_jd[jd_id] = per_jd.get(jd_id, 0) + 1
+        shortlist.append(int(row))
+        if len(shortlist) >= max_pairs:
+            break
+    return shortlist
+
+
+def _rerank_candidates(records: List[Dict], queries: List[Tuple[str, float]]) -> Dict[str, Dict]:
+    """Per JD: weighted mean over queries of its best reranked chunk (0 if none), plus evidence."""
+    index, matrix = _candidate_chunks(records)
+    if not index.texts:
+        return {}
+
+    max_pairs = max(1, RECOMMEND_MAX_RERANK_PAIRS // len(queries))
+    best: Dict[str, Dict[int, Dict]] = {}
+    for q_index, (query, _) in enumerate(queries):
+        shortlist = _shortlist(index, matrix, query, max_pairs)
+        for item in rerank(query, [index.texts[row] for row in shortlist], len(shortlist)):
+            meta = index.metas[shortlist[item["index"]]]
+            jd_id = meta.get("jd_id")
+            current = best.setdefault(jd_id, {}).get(q_index)
+            if current is None or item["score"] > current["reranker_score"]:
+                best[jd_id][q_index] = {
+                    "section": meta.get("section"),
+                    "text": item["text"],
+                    "reranker_score": item["score"],
+                }
+
+    total_weight = sum(w for _, w in queries) or 1.0
+    scored = {}
+    for jd_id, per_query in best.items():
+        score = sum(_sigmoid(per_query[i]["reranker_score"]) * queries[i][1] for i in per_query) / total_weight
+        evidence = sorted(per_query.values(), key=lambda r: r["reranker_score"], reverse=True)[:2]
+        scored[jd_id] = {
+            "rerank_score": round(score, 4),
+            "evidence": [
+                {"section": r["section"], "text": r["text"], "reranker_score": round(r["reranker_score"], 3)}
+                for r in evidence
+            ],
+        }
+    return scored
+
+
+def recommend_jobs(resume_text: str, top_n: int = 10, candidates: Optional[int] = None) -> Dict:
+    if not library_exists():
+        return {"count": 0, "results": [], "library_jds": 0}
+
+    timings = {}
+    start = time.perf_counter()
+    index = refresh_job_index()
+    library = get_library()
+    timings["index_refresh_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    start = time.perf_counter()
+    resume_db, _, resume_cached = get_resume_store(resume_text)
+    try:
+        dense = get_dense_index(resume_db)
+        texts, metas, matrix = dense.texts, dense.metas, dense.matrix
+    finally:
+        release_collection(resume_db)
+    sections = [m.get("section", "other") for m in metas]
+    query_vec = weighted_section_vector(matrix, sections, RESUME_SECTION_WEIGHTS)
+    timings["resume_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    start = time.perf_counter()
+    top_n = min(top_n, RECOMMEND_MAX_CANDIDATES)
+    n_candidates = min(max(candidates or RECOMMEND_CANDIDATES, top_n), RECOMMEND_MAX_CANDIDATES)
+    ann_hits = index.search(query_vec, n_candidates) if texts else []
+    timings["ann_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    start = time.perf_counter()
+    records = [library.get(jd_id) for jd_id, _ in ann_hits]
+    queries = _resume_queries(texts, sections)
+    reranked = _rerank_candidates(records, queries) if records and queries else {}
+    timings["rerank_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    results = []
+    for (jd_id, ann_score), record in zip(ann_hits, records):
+        stage2 = reranked.get(jd_id, {"rerank_score": 0.0, "evidence": []})
+        results.append({
+            "jd_id": jd_id,
+            "title": record["title"],
+            "ann_score": round(ann_score, 4),
+            **stage2,
+        })
+
+    results.sort(key=lambda r: (r["rerank_score"], r["ann_score"]), reverse=True)
+    results = results[:top_n]
+    for rank, r in enumerate(results, start=1):
+        r["rank"] = rank
+
+    return {
+        "count": len(results),
+        "library_jds": len(index.jd_ids),
+        "candidates_considered": len(ann_hits),
+        "ann_backend": "hnsw" if index.uses_ann() else "exact",
+        "resume_cached": resume_cached,
+        "timings": timings,
+        "results": results,
+    }
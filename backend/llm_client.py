@@ -0,0 +1,33 @@
+"""
+Shared Groq client.
+
+The Groq client holds an HTTP connection pool, so it is created once and
+reused instead of being rebuilt for every LLM call.
+"""
+
+import os
+from threading import Lock
+
+from groq import Groq
+
+_client = None
+_lock = Lock()
+
+
+def get_groq_client() -> Groq:
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                api_key = os.environ.get("GROQ_API_KEY")
+                if not api_key:
+                    raise RuntimeError("❌ GROQ_API_KEY not set.")
+                _client = Groq(api_key=api_key)
+    return _client
+
+
+def set_groq_client(client):
+    """Replace the shared client, e.g. with a local stub in benchmarks."""
+    global _client
+    with _lock:
+        _client = client
@@ -1,16 +1,63 @@
-from fastapi import FastAPI, UploadFile, File, Form
+import time
+
+_PROCESS_START = time.perf_counter()
+
+import asyncio
+import os
+import threading
+from typing import List
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-import fitz  
-import re   
 from resume_jd_rag import get_embeddings_and_store  
-from gap_analysis_llm import run_gap_analysis   
+from batch_analysis import ingest_pairs, run_batch_analysis
+from executors import run_cpu, run_io, shutdown_executors
+from pdf_ingest import PdfLimitError, extract_pdf_text as _extract_pdf_text
+from sse import sse_event, sse_response, token_events
+from gap_analysis_llm import (
+    GAP_ANALYSIS_QUERIES,
+    run_gap_analysis,
+    run_gap_retrieval,
+    stream_gap_analysis_with_llm,
+)
+from query_expansion import (
+    EXPANSION_CACHE_FILE,
+    load_expansion_cache,
+    prewarm_expansions,
+    save_expansion_cache,
+)
        
 from fastapi import FastAPI
 from chat_endpoint import router as chat_router
-from memory_db import resume_db as mem_resume_db, jd_db as mem_jd_db
+from session_store import create_session, delete_session, session_stats, start_reaper, stop_reaper
+from collection_registry import collection_stats, release_collection
+from ingest_cache import ingest_cache_stats
+from reranker import reranker_stats
+from dense_index import dense_index_stats
+from jd_library import add_jd, get_library, get_library_jd, library_exists, library_stats
+from job_recommender import recommend_jobs, refresh_job_index
 from speech_to_text import router as stt_router
+from model_registry import all_models_loaded, model_stats, warmup_models
+from similarity_score import SIMILARITY_MODE
+
+
+# eager: load models before serving (default)
+# background: start serving immediately, load models in a background thread
+# lazy: load each model on first use
+MODEL_LOAD_MODES = ("eager", "background", "lazy")
+MODEL_LOAD_MODE = os.getenv("MODEL_LOAD_MODE", "eager").lower()
+if MODEL_LOAD_MODE not in MODEL_LOAD_MODES:
+    raise ValueError(f"Unknown MODEL_LOAD_MODE '{MODEL_LOAD_MODE}', expected one of {MODEL_LOAD_MODES}")
 
+# In chunk similarity mode neither /analyze nor /analyze/batch needs the
+# bge-base model, so it is never loaded.
+REQUIRED_MODELS = ("embedder", "reranker") if SIMILARITY_MODE == "chunk" else ("embedder", "similarity", "reranker")
+
+_startup = {"seconds_to_serving": None, "seconds_to_ready": None}
+
+MAX_BATCH_DOCUMENTS = int(os.getenv("MAX_BATCH_DOCUMENTS", "500"))
+# Max pairs that get a full LLM gap analysis in one /analyze/batch request.
+MAX_BATCH_GAP_ANALYSES = int(os.getenv("MAX_BATCH_GAP_ANALYSES", "10"))
 
 
 app = FastAPI()
@@ -25,67 +72,357 @@ app.add_middleware(
 )
 
 
+def _load_required_models() -> bool:
+    try:
+        warmup_models(REQUIRED_MODELS)
+        return True
+    except Exception as e:
+        print(f"❌ Warm-up failed: {e}")
+        return False
+
+
+def _warm_up():
+    """
+    Runs on a background thread in every mode: prewarming query expansions
+    (Groq calls) and the job index (scales with the JD library) never
+    delay serving. Models load here too in background mode.
+    """
+    if MODEL_LOAD_MODE == "background" and not _load_required_models():
+        return
+
+    try:
+        loaded = load_expansion_cache(EXPANSION_CACHE_FILE)
+        if loaded:
+            print(f"📦 Loaded {loaded} cached query expansions")
+        prewarm_expansions(GAP_ANALYSIS_QUERIES)
+        if library_exists():
+            refresh_job_index()
+    except Exception as e:
+        print(f"❌ Warm-up failed: {e}")
+        return
+
+    _startup["seconds_to_ready"] = round(time.perf_counter() - _PROCESS_START, 3)
+    print(f"✅ Ready after {_startup['seconds_to_ready']}s ({MODEL_LOAD_MODE} model loading)")
+
+
+@app.on_event("startup")
+def start_session_reaper():
+    start_reaper()
+
+
+@app.on_event("startup")
+def warm_up():
+    models_loaded = MODEL_LOAD_MODE != "eager" or _load_required_models()
+
+    _startup["seconds_to_serving"] = round(time.perf_counter() - _PROCESS_START, 3)
+    if models_loaded:
+        threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
+
+
+@app.on_event("shutdown")
+def stop_session_reaper():
+    stop_reaper()
+
+
+@app.on_event("shutdown")
+def stop_executors():
+    shutdown_executors()
+
+
+@app.on_event("shutdown")
+def persist_query_expansions():
+    if EXPANSION_CACHE_FILE:
+        save_expansion_cache(EXPANSION_CACHE_FILE)
+
+
+@app.get("/models")
+def models():
+    return model_stats()
+
+
+@app.get("/health")
+def health():
+    return {
+        "status": "ok",
+        "model_load_mode": MODEL_LOAD_MODE,
+        "startup": _startup,
+        "uptime_seconds": round(time.perf_counter() - _PROCESS_START, 1),
+        "sessions": session_stats(),
+        "collections": collection_stats(),
+        "ingest_cache": ingest_cache_stats(),
+        "reranker": reranker_stats(),
+        "dense_index": dense_index_stats(),
+        "jd_library": library_stats(),
+    }
+
+
+@app.get("/ready")
+def ready():
+    stats = model_stats()
+    # In lazy mode requests can be served before any model is loaded.
+    is_ready = MODEL_LOAD_MODE == "lazy" or all_models_loaded(REQUIRED_MODELS)
+    body = {
+        "ready": is_ready,
+        "model_load_mode": MODEL_LOAD_MODE,
+        "models": {k: v["loaded"] for k, v in stats["models"].items()},
+    }
+    return JSONResponse(body, status_code=200 if is_ready else 503)
+
+
 def extract_pdf_text(file: UploadFile):
-    content = file.file.read()
-    pdf = fitz.open(stream=content, filetype="pdf")
-    text = ""
+    try:
+        return _extract_pdf_text(file.file)
+    except PdfLimitError as e:
+        raise HTTPException(status_code=413, detail=f"{file.filename}: {e}")
+
 
-    for page in pdf:
-        text += page.get_text("text") + "\n" 
+async def _read_text(label: str, file, text):
+    if file:
+        print(f"📄 Using {label} PDF input...")
+        return await run_cpu(extract_pdf_text, file)
+    print(f"📄 Using {label} TEXT input...")
+    return text or ""
 
 
-    text = text.replace("C++", "cpp").replace("c++", "cpp")
+def _library_jd_text(jd_id: str) -> str:
+    record = get_library_jd(jd_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"JD {jd_id} not found in the library")
+    print(f"📚 Using library JD {jd_id}...")
+    return record["text"]
 
- 
-    text = re.sub(r"(?<=\s)[a-zA-Z](?=\s)", " ", text)
 
+async def _read_inputs(resume_file, resume_text, jd_file, jd_text, jd_id=""):
+    if jd_id:
+        # The library text maps to the library's stored chunks, so the JD
+        # is not embedded again.
+        jd_text, jd_file = await run_cpu(_library_jd_text, jd_id), None
 
-    cleaned_lines = []
-    for line in text.split("\n"):
-        cleaned_lines.append(" ".join(line.split())) 
+    # Both PDFs are parsed at the same time.
+    resume, jd = await asyncio.gather(
+        _read_text("RESUME", resume_file, resume_text),
+        _read_text("JD", jd_file, jd_text),
+    )
+
+    print("📄 Resume length:", len(resume))
+    print("📄 JD length:", len(jd))
+
+    return resume, jd
+
+
+async def _analyze_into_session(resume: str, jd: str, session_id: str, analysis_fn):
+    store_info = await run_cpu(get_embeddings_and_store, resume, jd)
+    print("📦 Ingestion cache hits: resume =", store_info["resume_cached"], "| jd =", store_info["jd_cached"])
+
+    resume_db = store_info["resume_db"]
+    jd_db = store_info["jd_db"]
+
+    try:
+        # Mostly waits on LLM calls and its own retrieval pool.
+        result = await run_io(analysis_fn, resume_db, jd_db)
+    except Exception:
+        release_collection(resume_db)
+        release_collection(jd_db)
+        raise
+
+    session = create_session(
+        session_id=session_id or None,
+        resume_db=resume_db,
+        jd_db=jd_db,
+        chunk_count=store_info["resume_chunks"] + store_info["jd_chunks"],
+        resume_text=resume,
+        jd_text=jd,
+        similarity_score=result["similarity_score"],
+        match_score=result["match_score_0_10"],
+    )
+    result["session_id"] = session.session_id
+
+    return result
 
-    cleaned_text = "\n".join(cleaned_lines).strip()
-    return cleaned_text
 
 @app.post("/analyze")
 async def analyze(
     resume_file: UploadFile = File(None),
     resume_text: str = Form(""),
     jd_file: UploadFile = File(None),
-    jd_text: str = Form("")
+    jd_text: str = Form(""),
+    jd_id: str = Form(""),
+    session_id: str = Form("")
 ):
     print("\n🚀 /analyze CALLED")
 
-    if resume_file:
-        resume = extract_pdf_text(resume_file)
-        print("📄 Using RESUME PDF input...")
-    else:
-        resume = resume_text or ""
-        print("📄 Using RESUME TEXT input...")
+    resume, jd = await _read_inputs(resume_file, resume_text, jd_file, jd_text, jd_id)
 
-    if jd_file:
-        jd = extract_pdf_text(jd_file)
-        print("📄 Using JD PDF input...")
-    else:
-        jd = jd_text or ""
-        print("📄 Using JD TEXT input...")
+    result = await _analyze_into_session(resume, jd, session_id, run_gap_analysis)
 
-    print("📄 Resume length:", len(resume))
-    print("📄 JD length:", len(jd))
+    return JSONResponse(result)
 
-    store_info = get_embeddings_and_store(resume, jd)
 
-    resume_db = store_info["resume_db"]
-    jd_db = store_info["jd_db"]
+@app.post("/analyze/stream")
+async def analyze_stream(
+    resume_file: UploadFile = File(None),
+    resume_text: str = Form(""),
+    jd_file: UploadFile = File(None),
+    jd_text: str = Form(""),
+    jd_id: str = Form(""),
+    session_id: str = Form("")
+):
+    """
+    Server-Sent Events version of /analyze: an "analysis" event with the
+    scores, skills and retrieved chunks, "token" events as the LLM gap
+    analysis is generated, then "done" with the full text.
+    """
+    print("\n🚀 /analyze/stream CALLED")
+
+    resume, jd = await _read_inputs(resume_file, resume_text, jd_file, jd_text, jd_id)
+
+    result = await _analyze_into_session(resume, jd, session_id, run_gap_retrieval)
+
+    def events():
+        yield sse_event("analysis", result)
+
+        tokens = stream_gap_analysis_with_llm(
+            similarity=result["similarity_score"],
+            match_score=result["match_score_0_10"],
+            resume_chunks=result["resume_retrieved_chunks"],
+            jd_chunks=result["jd_retrieved_chunks"],
+        )
+        parts = []
+        yield from token_events(tokens, parts)
+
+        yield sse_event("done", {"llm_analysis": "".join(parts).strip()})
+
+    return sse_response(events())
+
+
+async def _collect_documents(prefix: str, files: List[UploadFile], texts: List[str]):
+    files = files or []
+    parsed = await asyncio.gather(*(run_cpu(extract_pdf_text, f) for f in files))
+
+    docs = [(f.filename or f"{prefix}_{i + 1}", text) for i, (f, text) in enumerate(zip(files, parsed))]
+    for t in texts or []:
+        if t.strip():
+            docs.append((f"{prefix}_{len(docs) + 1}", t))
+    return docs
+
+
+@app.post("/analyze/batch")
+async def analyze_batch(
+    resume_files: List[UploadFile] = File(None),
+    resume_texts: List[str] = Form(None),
+    jd_files: List[UploadFile] = File(None),
+    jd_texts: List[str] = Form(None),
+    include_gap_analysis: bool = Form(False),
+    gap_analysis_top_n: int = Form(3),
+):
+    """
+    Rank the other side against the single resume or JD. Scores match
+    /analyze (same SIMILARITY_MODE and chunking); skills come from each
+    document's whole skills section rather than retrieved chunks. The top
+    gap_analysis_top_n pairs (at most MAX_BATCH_GAP_ANALYSES) can also get
+    the full /analyze gap analysis.
+    """
+    print("\n🚀 /analyze/batch CALLED")
+
+    n_documents = sum(len(x or []) for x in (resume_files, resume_texts, jd_files, jd_texts))
+    if n_documents > MAX_BATCH_DOCUMENTS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_DOCUMENTS} documents per batch")
+
+    resumes, jds = await asyncio.gather(
+        _collect_documents("resume", resume_files, resume_texts),
+        _collect_documents("jd", jd_files, jd_texts),
+    )
+
+    if not (len(resumes) == 1 and jds) and not (len(jds) == 1 and resumes):
+        raise HTTPException(status_code=400, detail="Send one resume with many JDs, or one JD with many resumes")
+
+    print("📄 Resumes:", len(resumes), "| JDs:", len(jds))
 
-    result = run_gap_analysis(resume_db, jd_db)
+    result = await run_cpu(run_batch_analysis, resumes, jds)
 
-    import memory_db
-    memory_db.resume_db = resume_db
-    memory_db.jd_db = jd_db
-    memory_db.similarity_score = result["similarity_score"]
-    memory_db.match_score = result["match_score_0_10"]
-    memory_db.resume_text = resume_text
-    memory_db.jd_text = jd_text
+    top_n = max(0, min(gap_analysis_top_n, MAX_BATCH_GAP_ANALYSES))
+    if include_gap_analysis and top_n:
+        anchor_text, others = (resumes[0][1], jds) if result["anchor_type"] == "resume" else (jds[0][1], resumes)
+        top = result["results"][:top_n]
+
+        other_texts = [others[r["index"]][1] for r in top]
+        store_infos = await run_cpu(ingest_pairs, result["anchor_type"], anchor_text, other_texts)
+        try:
+            # LLM bound, so on the IO pool, all pairs at once.
+            analyses = await asyncio.gather(
+                *(run_io(run_gap_analysis, info["resume_db"], info["jd_db"]) for info in store_infos)
+            )
+        finally:
+            for info in store_infos:
+                release_collection(info["resume_db"])
+                release_collection(info["jd_db"])
+
+        for r, analysis in zip(top, analyses):
+            r["gap_analysis"] = analysis
 
     return JSONResponse(result)
+
+
+@app.post("/jds")
+async def create_library_jd(
+    jd_file: UploadFile = File(None),
+    jd_text: str = Form(""),
+    title: str = Form(""),
+    jd_id: str = Form(""),
+):
+    """Store a JD in the shared library; /analyze can then use it by jd_id."""
+    text = await _read_text("JD", jd_file, jd_text)
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="JD text is empty")
+
+    try:
+        record, created = await run_cpu(add_jd, text, title, jd_id or None)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return {"jd_id": record["jd_id"], "title": record["title"], "chunks": record["row_count"], "created": created}
+
+
+@app.get("/jds")
+def list_library_jds(offset: int = 0, limit: int = 50):
+    if not library_exists():
+        return {"total": 0, "jds": []}
+    library = get_library()
+    return {"total": library.stats()["jds"], "jds": library.list_jds(offset, min(limit, 500))}
+
+
+@app.get("/jds/{jd_id}")
+def get_library_jd_record(jd_id: str):
+    record = get_library_jd(jd_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="JD not found")
+    return {k: record[k] for k in ("jd_id", "title", "text", "row_count", "created_at")}
+
+
+@app.post("/recommend-jobs")
+async def recommend_jobs_endpoint(
+    resume_file: UploadFile = File(None),
+    resume_text: str = Form(""),
+    top_n: int = Form(10),
+    candidates: int = Form(0),
+):
+    """Best-fitting library JDs for a resume: vector search, then hybrid search + rerank."""
+    print("\n🚀 /recommend-jobs CALLED")
+
+    if top_n < 1 or candidates < 0:
+        raise HTTPException(status_code=400, detail="top_n must be at least 1 and candidates non-negative")
+
+    resume = await _read_text("RESUME", resume_file, resume_text)
+    if not resume.strip():
+        raise HTTPException(status_code=400, detail="Resume text is empty")
+
+    # recommend_jobs caps both at RECOMMEND_MAX_CANDIDATES.
+    result = await run_cpu(recommend_jobs, resume, top_n=top_n, candidates=candidates or None)
+    return JSONResponse(result)
+
+
+@app.delete("/session/{session_id}")
+def end_session(session_id: str):
+    if not delete_session(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"deleted": session_id}
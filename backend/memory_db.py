@@ -1,12 +0,0 @@
-"""
-Temporary runtime memory shared between /analyze and /chat.
-"""
-
-resume_db = None
-jd_db = None
-
-resume_text = ""
-jd_text = ""
-
-similarity_score = None
-match_score = None
@@ -0,0 +1,200 @@
+"""
+Process-wide registry for the embedding, similarity and reranker models.
+
+Each model is loaded once on first use (or by warmup_models at startup) and
+shared by every request. Load time, warm-up time and memory are recorded so
+they can be exposed by the API.
+"""
+
+import os
+import time
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Tuple
+
+EMBED_MODEL = "BAAI/bge-small-en-v1.5"
+EMBED_DIM = 384
+SIMILARITY_MODEL = "BAAI/bge-base-en-v1.5"
+RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+# torch: fp32 PyTorch (default)
+# onnx: ONNX Runtime
+# onnx-int8: ONNX Runtime with int8 dynamic quantization
+# The ONNX backends need `pip install "optimum[onnxruntime]"`.
+INFERENCE_BACKENDS = ("torch", "onnx", "onnx-int8")
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch").lower()
+# Instruction set targeted by int8 quantization: avx2, avx512, avx512_vnni or arm64.
+ONNX_QUANTIZATION = os.getenv("ONNX_QUANTIZATION", "avx2")
+ONNX_CACHE_DIR = os.path.expanduser(os.getenv("ONNX_CACHE_DIR", "~/.cache/career-compass/onnx"))
+
+_models: Dict[str, Any] = {}
+_stats: Dict[str, Dict[str, Any]] = {}
+_locks = {"embedder": Lock(), "similarity": Lock(), "reranker": Lock()}
+
+
+def _current_rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/statm") as f:
+            rss_pages = int(f.read().split()[1])
+        return rss_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+        # Peak RSS, reported in KiB on Linux.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        return None
+
+
+def _param_mb(module) -> Optional[float]:
+    # ONNX-backed models have no torch parameters; rss_delta_mb still applies.
+    try:
+        return sum(p.numel() * p.element_size() for p in module.parameters()) / (1024 * 1024)
+    except AttributeError:
+        return None
+
+
+def _load(key: str, model_name: str, loader: Callable[[], Any], torch_module: Callable[[Any], Any]):
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _locks[key]:
+        model = _models.get(key)
+        if model is not None:
+            return model
+
+        print(f"⏳ Loading {key} model {model_name}...")
+        rss_before = _current_rss_mb()
+        start = time.perf_counter()
+        model = loader()
+        load_seconds = time.perf_counter() - start
+        rss_after = _current_rss_mb()
+        rss_delta = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+
+        _stats[key] = {
+            "model_name": model_name,
+            "backend": INFERENCE_BACKEND,
+            "load_seconds": round(load_seconds, 3),
+            "param_mb": _round(_param_mb(torch_module(model))),
+            "rss_delta_mb": _round(rss_delta),
+            "warmup_seconds": None,
+        }
+        _models[key] = model
+        print(f"✅ Loaded {key} model in {load_seconds:.2f}s")
+        return model
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 1) if value is not None else None
+
+
+def _quantized_model_dir(model_name: str, model_cls) -> Tuple[str, str]:
+    """
+    Export an int8 dynamically quantized ONNX copy of a model once and
+    return (local model dir, ONNX file name inside it).
+    """
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    save_dir = os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "__"))
+    file_name = f"onnx/model_qint8_{ONNX_QUANTIZATION}.onnx"
+
+    if not os.path.exists(os.path.join(save_dir, file_name)):
+        print(f"⏳ Quantizing {model_name} to int8 ({ONNX_QUANTIZATION})...")
+        model = model_cls(model_name, backend="onnx")
+        model.save(save_dir)
+        export_dynamic_quantized_onnx_model(model, ONNX_QUANTIZATION, save_dir)
+
+    return save_dir, file_name
+
+
+def _backend_args(model_name: str, model_cls, backend: str) -> Tuple[str, Dict[str, Any]]:
+    """(model name or path, constructor kwargs) for the requested backend."""
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Unknown INFERENCE_BACKEND '{backend}', expected one of {INFERENCE_BACKENDS}")
+    if backend == "torch":
+        return model_name, {}
+    if backend == "onnx":
+        return model_name, {"backend": "onnx"}
+
+    path, file_name = _quantized_model_dir(model_name, model_cls)
+    return path, {"backend": "onnx", "model_kwargs": {"file_name": file_name}}
+
+
+def build_sentence_transformer(model_name: str, backend: str = INFERENCE_BACKEND):
+    from sentence_transformers import SentenceTransformer
+    name_or_path, kwargs = _backend_args(model_name, SentenceTransformer, backend)
+    return SentenceTransformer(name_or_path, **kwargs)
+
+
+def build_cross_encoder(model_name: str, backend: str = INFERENCE_BACKEND):
+    from sentence_transformers import CrossEncoder
+    name_or_path, kwargs = _backend_args(model_name, CrossEncoder, backend)
+    return CrossEncoder(name_or_path, **kwargs)
+
+
+def get_embedder():
+    """bge-small embeddings used for the per-document Chroma collections."""
+    def loader():
+        from langchain_huggingface import HuggingFaceEmbeddings
+        from sentence_transformers import SentenceTransformer
+        name_or_path, kwargs = _backend_args(EMBED_MODEL, SentenceTransformer, INFERENCE_BACKEND)
+        return HuggingFaceEmbeddings(model_name=name_or_path, model_kwargs=kwargs)
+
+    def sentence_transformer(m):
+        return getattr(m, "_client", None) or getattr(m, "client", None)
+
+    return _load("embedder", EMBED_MODEL, loader, sentence_transformer)
+
+
+def get_similarity_model():
+    """bge-base sentence encoder used for whole-document similarity."""
+    return _load(
+        "similarity", SIMILARITY_MODEL, lambda: build_sentence_transformer(SIMILARITY_MODEL), lambda m: m
+    )
+
+
+def get_reranker():
+    """MS MARCO cross-encoder used to rerank hybrid search candidates."""
+    return _load(
+        "reranker", RERANKER_MODEL, lambda: build_cross_encoder(RERANKER_MODEL), lambda m: m.model
+    )
+
+
+_WARMUP_TEXTS = [
+    "Python, FastAPI, React, SQL, Docker",
+    "Built a retrieval pipeline for resume and job description matching.",
+]
+
+
+MODEL_KEYS = ("embedder", "similarity", "reranker")
+
+
+def warmup_models(keys=MODEL_KEYS):
+    """Load the given models and run a dummy batch through each."""
+    warmups = {
+        "embedder": lambda: get_embedder().embed_documents(_WARMUP_TEXTS),
+        "similarity": lambda: get_similarity_model().encode(_WARMUP_TEXTS),
+        "reranker": lambda: get_reranker().predict([[_WARMUP_TEXTS[0], t] for t in _WARMUP_TEXTS]),
+    }
+
+    for key in keys:
+        run = warmups[key]
+        start = time.perf_counter()
+        run()
+        _stats[key]["warmup_seconds"] = round(time.perf_counter() - start, 3)
+
+
+def all_models_loaded(keys=MODEL_KEYS) -> bool:
+    return all(key in _models for key in keys)
+
+
+def model_stats() -> Dict[str, Any]:
+    return {
+        "models": {
+            key: {"loaded": key in _models, **_stats.get(key, {})}
+            for key in _locks
+        },
+        "process_rss_mb": _round(_current_rss_mb()),
+    }
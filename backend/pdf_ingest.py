@@ -0,0 +1,93 @@
+"""
+PDF text extraction for uploaded resumes and JDs.
+
+Uploads are read with a size cap and rejected before parsing if they are
+too large or have too many pages. Each page is normalized on its own as it
+is extracted, so no whole-document string is built and re-scanned; PDFs
+with many pages are split into page ranges that are extracted in parallel
+on the process pool.
+
+The output is identical to the old whole-document cleanup: C++ -> cpp,
+single letters between whitespace removed, whitespace collapsed per line.
+"""
+
+import os
+import re
+from typing import BinaryIO, List
+
+import fitz
+
+from executors import PROCESS_WORKERS, get_process_pool
+
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(20 * 1024 * 1024)))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "50"))
+# PDFs with at least this many pages are extracted on the process pool.
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+
+_SINGLE_LETTER = re.compile(r"(?<=\s)[a-zA-Z](?=\s)")
+_READ_CHUNK = 1024 * 1024
+
+
+class PdfLimitError(ValueError):
+    """The upload is larger than PDF_MAX_BYTES or longer than PDF_MAX_PAGES."""
+
+
+def read_upload(stream: BinaryIO, max_bytes: int = PDF_MAX_BYTES) -> bytes:
+    parts: List[bytes] = []
+    total = 0
+    while True:
+        part = stream.read(_READ_CHUNK)
+        if not part:
+            break
+        total += len(part)
+        if total > max_bytes:
+            raise PdfLimitError(f"PDF is larger than {max_bytes // (1024 * 1024)} MB")
+        parts.append(part)
+    return b"".join(parts)
+
+
+def normalize_page(text: str, first: bool) -> str:
+    text = text.replace("C++", "cpp").replace("c++", "cpp")
+
+    # Pages used to be joined with "\n", so every page but the first is
+    # preceded by a newline and every page is followed by one; padding the
+    # page the same way keeps the lookarounds identical at page boundaries.
+    padded = text + "\n" if first else "\n" + text + "\n"
+    padded = _SINGLE_LETTER.sub(" ", padded)
+    text = padded[:-1] if first else padded[1:-1]
+
+    return "\n".join(" ".join(line.split()) for line in text.split("\n"))
+
+
+def _normalized_pages(pdf, start: int, stop: int) -> List[str]:
+    return [normalize_page(pdf[i].get_text("text"), first=i == 0) for i in range(start, stop)]
+
+
+def _extract_pages(content: bytes, start: int, stop: int) -> List[str]:
+    with fitz.open(stream=content, filetype="pdf") as pdf:
+        return _normalized_pages(pdf, start, stop)
+
+
+def _page_ranges(page_count: int, parts: int):
+    size = -(-page_count // parts)
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def extract_pdf_text(stream: BinaryIO, parallel: bool = True) -> str:
+    """parallel=False keeps extraction in this process, e.g. inside a pool worker."""
+    content = read_upload(stream)
+
+    with fitz.open(stream=content, filetype="pdf") as pdf:
+        page_count = pdf.page_count
+        if page_count > PDF_MAX_PAGES:
+            raise PdfLimitError(f"PDF has {page_count} pages, the limit is {PDF_MAX_PAGES}")
+
+        if not parallel or page_count < PDF_PARALLEL_MIN_PAGES or PROCESS_WORKERS <= 1:
+            return "\n".join(_normalized_pages(pdf, 0, page_count)).strip()
+
+    pool = get_process_pool()
+    futures = [
+        pool.submit(_extract_pages, content, start, stop)
+        for start, stop in _page_ranges(page_count, PROCESS_WORKERS)
+    ]
+    return "\n".join(page for future in futures for page in future.result()).strip()
@@ -1,10 +1,56 @@
 
 import os
-from groq import Groq
+import json
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Iterable, Optional, Tuple
 
-_groq = Groq(api_key=os.getenv("GROQ_API_KEY"))
+from llm_client import get_groq_client
 
-def expand_query(user_query: str) -> str:
+EXPANSION_CACHE_SIZE = int(os.getenv("EXPANSION_CACHE_SIZE", "1024"))
+EXPANSION_CACHE_TTL = float(os.getenv("EXPANSION_CACHE_TTL", "86400"))
+# Optional JSON file used to keep expansions across restarts.
+EXPANSION_CACHE_FILE = os.getenv("EXPANSION_CACHE_FILE", "")
+
+# normalized query -> (expanded query, unix time it was stored)
+_cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+# Pre-warmed canonical queries are never evicted by TTL or LRU.
+_pinned = set()
+_lock = Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _cache_key(user_query: str) -> str:
+    return " ".join(user_query.lower().split())
+
+
+def _cache_get(key: str) -> Optional[str]:
+    with _lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        expanded, stored_at = entry
+        if key not in _pinned and time.time() - stored_at > EXPANSION_CACHE_TTL:
+            del _cache[key]
+            return None
+        _cache.move_to_end(key)
+        return expanded
+
+
+def _cache_put(key: str, expanded: str, stored_at: Optional[float] = None, pin: bool = False):
+    with _lock:
+        _cache[key] = (expanded, stored_at or time.time())
+        _cache.move_to_end(key)
+        if pin:
+            _pinned.add(key)
+
+        evictable = [k for k in _cache if k not in _pinned]
+        for k in evictable[: max(0, len(_cache) - EXPANSION_CACHE_SIZE)]:
+            del _cache[k]
+
+
+def _expand_with_llm(user_query: str) -> str:
     prompt = f"""
 Rewrite the following user query into a search-optimized query for semantic retrieval.
 Make it explicit, skill-focused, and context-rich.
@@ -14,7 +60,7 @@ User query: "{user_query}"
 Return ONLY the rewritten query.
 """
 
-    resp = _groq.chat.completions.create(
+    resp = get_groq_client().chat.completions.create(
         model="llama-3.1-8b-instant",
         messages=[{"role": "user", "content": prompt}],
         temperature=0.1,
@@ -22,3 +68,80 @@ Return ONLY the rewritten query.
     )
 
     return resp.choices[0].message.content.strip()
+
+
+def expand_query(user_query: str) -> str:
+    key = _cache_key(user_query)
+
+    cached = _cache_get(key)
+    with _lock:
+        _stats["hits" if cached is not None else "misses"] += 1
+    if cached is not None:
+        return cached
+
+    expanded = _expand_with_llm(user_query)
+    _cache_put(key, expanded)
+    return expanded
+
+
+def prewarm_expansions(queries: Iterable[str]):
+    """
+    Make sure the given fixed queries are expanded and pinned in the cache,
+    so they never go to the LLM on the request path.
+    """
+    for q in queries:
+        key = _cache_key(q)
+        cached = _cache_get(key)
+        if cached is None:
+            try:
+                cached = _expand_with_llm(q)
+            except Exception as e:
+                print(f"⚠️ Query expansion pre-warm failed for '{q}': {e}")
+                continue
+        _cache_put(key, cached, pin=True)
+
+    if EXPANSION_CACHE_FILE:
+        save_expansion_cache(EXPANSION_CACHE_FILE)
+
+
+def load_expansion_cache(path: str) -> int:
+    if not path or not os.path.exists(path):
+        return 0
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not read expansion cache {path}: {e}")
+        return 0
+
+    now = time.time()
+    loaded = 0
+    for key, entry in entries.items():
+        expanded, stored_at = entry["expanded"], entry["stored_at"]
+        if now - stored_at > EXPANSION_CACHE_TTL:
+            continue
+        _cache_put(key, expanded, stored_at=stored_at)
+        loaded += 1
+    return loaded
+
+
+def save_expansion_cache(path: str):
+    with _lock:
+        entries = {
+            key: {"expanded": expanded, "stored_at": stored_at}
+            for key, (expanded, stored_at) in _cache.items()
+        }
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entries, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def expansion_cache_stats() -> Dict[str, int]:
+    with _lock:
+        size = len(_cache)
+        pinned = len(_pinned)
+        stats = dict(_stats)
+    return {"size": size, "pinned": pinned, **stats}
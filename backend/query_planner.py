@@ -0,0 +1,96 @@
+import json
+from typing import Dict, List
+
+from groq import APIError
+
+from llm_client import get_groq_client
+from intent_detection import QueryTarget, target_for_retrieval
+from history_rewrite import rewrite_query
+from query_expansion import expand_query
+
+
+def _format_history(history: List[Dict[str, str]]) -> str:
+    return "\n".join(f"{h['role']}: {h['content']}" for h in history)
+
+
+def _plan_with_llm(history: List[Dict[str, str]], user_message: str) -> Dict[str, object]:
+    client = get_groq_client()
+
+    prompt = f"""
+You are the query planner inside a RAG chatbot that answers questions
+about a candidate's resume and a job description (JD).
+
+Produce three things for the user's latest message:
+
+1. "rewritten": a clear, standalone search query.
+   - Preserve the user's original intent exactly.
+   - Do NOT introduce comparison words such as "compare", "gap",
+     "missing", or "requirements" unless the user explicitly asks for them.
+   - For GENERAL readiness or suitability questions, focus ONLY on the
+     candidate and include terms like skills, experience, background, projects.
+   - Use conversation history ONLY to resolve vague references
+     like "that", "those", or "it".
+   - Do NOT answer the question.
+
+2. "expanded": the rewritten query turned into a search-optimized query
+   for semantic retrieval. Make it explicit, skill-focused, and context-rich.
+
+3. "target": which context is needed to answer the rewritten query.
+   - "resume": readiness, suitability, strengths or background in a
+     GENERAL sense, without asking about requirements or comparison
+   - "jd": what is required, expected, or needed for a role
+   - "both": missing skills, gaps, comparison, or readiness for THIS job
+
+Conversation History:
+{_format_history(history)}
+
+User message:
+"{user_message}"
+
+Respond with ONLY a JSON object:
+{{"rewritten": "...", "expanded": "...", "target": "resume" | "jd" | "both"}}
+"""
+
+    resp = client.chat.completions.create(
+        model="llama-3.1-8b-instant",
+        messages=[{"role": "user", "content": prompt}],
+        response_format={"type": "json_object"},
+        max_tokens=200,
+        temperature=0.0,
+    )
+
+    plan = json.loads(resp.choices[0].message.content)
+    if not isinstance(plan, dict):
+        raise ValueError(f"Query plan is not a JSON object: {plan!r}")
+
+    rewritten = str(plan.get("rewritten", "")).strip()
+    expanded = str(plan.get("expanded", "")).strip()
+    target = QueryTarget(str(plan.get("target", "")).strip().lower())
+
+    if len(rewritten) < 3 or len(expanded) < 3:
+        raise ValueError(f"Incomplete query plan: {plan}")
+
+    return {"rewritten": rewritten, "expanded": expanded, "target": target}
+
+
+def _plan_step_by_step(history: List[Dict[str, str]], user_message: str) -> Dict[str, object]:
+    rewritten = rewrite_query(history, user_message)
+    return {
+        "rewritten": rewritten,
+        "expanded": expand_query(rewritten),
+        "target": target_for_retrieval(rewritten),
+    }
+
+
+def plan_query(history: List[Dict[str, str]], user_message: str) -> Dict[str, object]:
+    """
+    Rewrite, expand and route a chat message with a single LLM call.
+
+    Falls back to the separate rewrite / expansion / intent steps if the
+    combined response cannot be parsed or the Groq call fails.
+    """
+    try:
+        return _plan_with_llm(history, user_message)
+    except (ValueError, TypeError, AttributeError, APIError) as e:
+        print(f"⚠️ Query planner fell back to per-step calls: {e}")
+        return _plan_step_by_step(history, user_message)
@@ -1,22 +1,170 @@
 
-from sentence_transformers import CrossEncoder
+import hashlib
+import os
+import queue
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from threading import Lock, Thread
+from typing import Dict, List, Tuple
+
+from model_registry import get_reranker
+
+# Pairs from concurrent rerank() calls are collected for up to
+# RERANK_MAX_WAIT_MS (or until RERANK_MAX_BATCH_SIZE pairs) and scored in
+# one CrossEncoder.predict call.
+RERANK_BATCHING = os.getenv("RERANK_BATCHING", "1") != "0"
+RERANK_MAX_BATCH_SIZE = int(os.getenv("RERANK_MAX_BATCH_SIZE", "64"))
+RERANK_MAX_WAIT_MS = float(os.getenv("RERANK_MAX_WAIT_MS", "5"))
+
+# Cross-encoder scores keyed by (query hash, chunk hash); only pairs missing
+# from the cache are sent to the model.
+RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "50000"))
+
+
+class _RerankBatcher:
+    def __init__(self, max_batch_size: int, max_wait_ms: float):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread = None
+        self._carry = None  # item that did not fit in the previous batch
+        self._lock = Lock()
+        self.stats = {"batches": 0, "pairs": 0, "requests": 0}
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(target=self._run, name="rerank-batcher", daemon=True)
+                self._thread.start()
+
+    def score(self, pairs: List[List[str]]) -> List[float]:
+        self._ensure_started()
+        # Large submissions are split so no batch exceeds max_batch_size.
+        futures = []
+        for start in range(0, len(pairs), self.max_batch_size):
+            future: Future = Future()
+            self._queue.put((pairs[start: start + self.max_batch_size], future))
+            futures.append(future)
+        return [s for future in futures for s in future.result()]
+
+    def _collect(self) -> List[tuple]:
+        if self._carry is not None:
+            batch, self._carry = [self._carry], None
+        else:
+            batch = [self._queue.get()]
+        n_pairs = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+
+        while n_pairs < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if n_pairs + len(item[0]) > self.max_batch_size:
+                self._carry = item
+                break
+            batch.append(item)
+            n_pairs += len(item[0])
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            all_pairs = [p for pairs, _ in batch for p in pairs]
+
+            try:
+                scores = get_reranker().predict(all_pairs, batch_size=self.max_batch_size)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.stats["batches"] += 1
+            self.stats["pairs"] += len(all_pairs)
+            self.stats["requests"] += len(batch)
+
+            offset = 0
+            for pairs, future in batch:
+                future.set_result([float(s) for s in scores[offset: offset + len(pairs)]])
+                offset += len(pairs)
+
+
+_batcher = _RerankBatcher(RERANK_MAX_BATCH_SIZE, RERANK_MAX_WAIT_MS)
+
+
+def _score_pairs(pairs: List[List[str]]) -> List[float]:
+    if RERANK_BATCHING:
+        return _batcher.score(pairs)
+    return [float(s) for s in get_reranker().predict(pairs)]
+
+
+_score_cache: "OrderedDict[Tuple[bytes, bytes], float]" = OrderedDict()
+_cache_lock = Lock()
+_cache_stats = {"cache_hits": 0, "cache_misses": 0}
+
+
+def _text_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _cached_scores(query: str, docs: List[str]) -> List[float]:
+    q_hash = _text_hash(query)
+    keys = [(q_hash, _text_hash(d)) for d in docs]
+
+    scores: List = [None] * len(docs)
+    with _cache_lock:
+        for i, key in enumerate(keys):
+            cached = _score_cache.get(key)
+            if cached is not None:
+                _score_cache.move_to_end(key)
+                scores[i] = cached
+
+    missing = [i for i, s in enumerate(scores) if s is None]
+    with _cache_lock:
+        _cache_stats["cache_hits"] += len(docs) - len(missing)
+        _cache_stats["cache_misses"] += len(missing)
+
+    if missing:
+        new_scores = _score_pairs([[query, docs[i]] for i in missing])
+        with _cache_lock:
+            for i, score in zip(missing, new_scores):
+                scores[i] = score
+                _score_cache[keys[i]] = score
+            while len(_score_cache) > RERANK_CACHE_SIZE:
+                _score_cache.popitem(last=False)
+
+    return scores
 
-reranker = CrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2")
 
 def rerank(query: str, docs: list, top_k: int = 3):
 
     if not docs:
         return []
 
-    pairs = [[query, d] for d in docs]
-
-    scores = reranker.predict(pairs)
+    scores = _cached_scores(query, docs)
 
+    # "index" is the position in docs, so callers can map results back to
+    # their candidates without comparing texts.
     scored_docs = [
-        {"text": d, "score": float(s)}
-        for d, s in zip(docs, scores)
+        {"text": d, "score": float(s), "index": i}
+        for i, (d, s) in enumerate(zip(docs, scores))
     ]
 
     scored_docs.sort(key=lambda x: x["score"], reverse=True)
 
     return scored_docs[:top_k]
+
+
+def reranker_stats() -> Dict[str, float]:
+    stats = dict(_batcher.stats)
+    stats["batching"] = RERANK_BATCHING
+    stats["avg_batch_pairs"] = round(stats["pairs"] / stats["batches"], 1) if stats["batches"] else 0.0
+    with _cache_lock:
+        stats.update(_cache_stats)
+        stats["cache_entries"] = len(_score_cache)
+    return stats
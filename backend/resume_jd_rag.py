@@ -2,14 +2,18 @@
 
 import uuid
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_chroma import Chroma
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from bm25_index import collection_name, index_texts
+from dense_index import index_embeddings
+from collection_registry import register_collection
+from ingest_cache import content_key, get_or_build
+from jd_library import find_library_jd, get_library
+from model_registry import EMBED_MODEL, get_embedder
 
-EMBED_MODEL = "BAAI/bge-small-en-v1.5"
 
 def basic_clean(text: str) -> str:
     text = text.replace("\t", " ").replace("•", " ")
@@ -24,86 +28,165 @@ SECTION_KEYWORDS = {
     "education": ["education", "academic background"],
 }
 
-def _normalize_heading(line: str) -> str:
-    return re.sub(r"[^a-zA-Z ]", " ", line.lower()).strip()
+EXPERIENCE_KEYWORDS = [
+    "experience", "work experience",
+    "employment", "internship", "intern",
+    "worked at", "role", "responsibilities"
+]
+
+ACHIEVEMENT_KEYWORDS = [
+    "award", "achievement", "certificate", "certification",
+    "certified", "nptel", "honored", "recognition", "prize",
+    "dr. a.p.j", "kalam"
+]
+
+
+def _minimal_keywords(keywords: List[str]) -> List[str]:
+    # A keyword containing another keyword of the same set can never decide
+    # a match on its own, e.g. "internship" always contains "intern".
+    return [k for k in keywords if not any(o != k and o in k for o in keywords)]
+
+
+def _compile_line_rules() -> List[Tuple[str, bool, str, "re.Pattern"]]:
+    """
+    Flatten every keyword set into one table of
+    (section, keep_line, substring, pattern), in the order lines are tested:
+    experience, then achievements, then section headings in
+    SECTION_KEYWORDS order.
+
+    Experience and achievement keywords are plain substrings of the
+    lowercased line. Headings used to be matched against the line with
+    every non-letter replaced by a space; a one-word heading keyword matches
+    that iff it is a substring of the lowercased line, and a multi-word one
+    is compiled with [^a-z] between the words.
+    """
+    rules = []
+    for kw in _minimal_keywords(EXPERIENCE_KEYWORDS):
+        rules.append(("experience", False, kw, None))
+    for kw in _minimal_keywords(ACHIEVEMENT_KEYWORDS):
+        rules.append(("achievements", True, kw, None))
 
-
-def _looks_like_project(line: str) -> bool:
-
-    if "|" in line and len(line.split("|")[0].strip()) > 3:
-        return True
-    return False
-
-def _is_experience_line(text: str) -> bool:
-    text_l = text.lower()
-
-    strong_exp_keywords = [
-        "experience", "work experience",
-        "employment", "internship", "intern",
-        "worked at", "role", "responsibilities"
-    ]
-
-
-    return any(k in text_l for k in strong_exp_keywords)
-
-
-def _is_achievement_line(text: str) -> bool:
-    text_l = text.lower()
-
-    achievement_keywords = [
-        "award", "achievement", "certificate", "certification",
-        "certified", "nptel", "honored", "recognition", "prize",
-        "dr. a.p.j", "kalam"
-    ]
-
-    return any(k in text_l for k in achievement_keywords)
-
-def _detect_section_from_line(line: str) -> str:
-    norm = _normalize_heading(line)
     for section, keywords in SECTION_KEYWORDS.items():
+        for kw in _minimal_keywords(keywords):
+            if re.search(r"[^a-z ]", kw):
+                continue  # can never match a normalized heading
+            if " " in kw:
+                pattern = re.compile("[^a-z]".join(re.escape(w) for w in kw.split(" ")))
+                rules.append((section, False, None, pattern))
+            else:
+                rules.append((section, False, kw, None))
+    return rules
+
+
+_LINE_RULES = _compile_line_rules()
+
+
+def classify_line(line: str) -> Optional[Tuple[str, bool]]:
+    """
+    Return (section, keep_line) if the stripped line starts a section, or
+    None for a plain content line. keep_line tells whether the line itself
+    belongs to the new section's text (project and achievement lines) or is
+    only a heading.
+    """
+    if "|" in line and len(line.partition("|")[0].strip()) > 3:
+        return "projects", True
+
+    low = line.lower()
+    for section, keep, kw, pattern in _LINE_RULES:
+        if kw is not None:
+            if kw in low:
+                return section, keep
+        elif pattern.search(low):
+            return section, keep
+    return None
+
+
+# JD headings, normalized like headings above (lowercase letters and single
+# spaces). Checked in this order, so e.g. "preferred qualifications" is
+# "preferred" and "about the role" is "summary".
+JD_HEADING_KEYWORDS = {
+    "summary": [
+        "about the role", "about the job", "about us", "about the company", "about the team",
+        "overview", "summary", "who we are",
+    ],
+    "preferred": ["nice to have", "good to have", "preferred", "bonus", "bonus points"],
+    "responsibilities": [
+        "responsibilities", "what you ll do", "what you will do", "duties", "day to day", "the role", "your role",
+    ],
+    "requirements": [
+        "requirements", "qualifications", "what we re looking for", "what you bring", "who you are",
+        "must have", "experience",
+    ],
+    "skills": ["skills", "tech stack", "technologies", "technical skills"],
+    "education": ["education"],
+    "benefits": ["benefits", "perks", "what we offer"],
+}
+JD_HEADING_MAX_WORDS = 5
+
+
+def classify_jd_heading(line: str) -> Optional[str]:
+    """
+    Section a stripped JD line starts, or None for content. Only short
+    lines are headings, and a keyword must be the whole line or its first /
+    last words ("Key Responsibilities:", "Requirements"), so a requirement
+    such as "Strong experience with Go" stays content.
+    """
+    words = re.sub(r"[^a-z ]", " ", line.lower()).split()
+    if not words or len(words) > JD_HEADING_MAX_WORDS:
+        return None
+    norm = " ".join(words)
+    for section, keywords in JD_HEADING_KEYWORDS.items():
         for kw in keywords:
-            if kw in norm:
+            if norm == kw or norm.startswith(kw + " ") or norm.endswith(" " + kw):
                 return section
-    return ""
+    return None
+
 
-def split_into_sections(raw_text: str, default_section="other") -> Dict[str, str]:
-    lines = raw_text.split("\n")
+def _split_jd_sections(raw_text: str, default_section: str) -> Dict[str, str]:
+    # JD bodies are mostly requirement lines; the resume line rules would
+    # treat "... experience with ..." as an experience heading and drop it.
     sections: Dict[str, List[str]] = {}
     current_section = default_section
 
-    for line in lines:
+    for line in raw_text.split("\n"):
         stripped = line.strip()
         if not stripped:
             continue
 
-        if _looks_like_project(stripped):
-            current_section = "projects"
-            sections.setdefault("projects", []).append(stripped)
+        heading = classify_jd_heading(stripped)
+        if heading is not None:
+            current_section = heading
+            sections.setdefault(current_section, [])
             continue
 
-        if _is_experience_line(stripped):
-            current_section = "experience"
-            sections.setdefault("experience", [])
-            continue
+        sections.setdefault(current_section, []).append(stripped)
 
+    return {sec: "\n".join(content).strip() for sec, content in sections.items()}
 
-        if _is_achievement_line(stripped):
-            current_section = "achievements"
-            sections.setdefault("achievements", []).append(stripped)
-            continue
 
-        detected = _detect_section_from_line(stripped)
+def split_into_sections(raw_text: str, default_section="other", doc_type: str = "resume") -> Dict[str, str]:
+    if doc_type == "jd":
+        return _split_jd_sections(raw_text, default_section)
 
+    sections: Dict[str, List[str]] = {}
+    current_section = default_section
 
-        if detected == "experience" and not _is_experience_line(stripped):
-            detected = None
+    for line in raw_text.split("\n"):
+        stripped = line.strip()
+        if not stripped:
+            continue
 
-        if detected:
-            current_section = detected
-            sections.setdefault(current_section, [])
+        label = classify_line(stripped)
+        if label is not None:
+            current_section, keep = label
+            section_lines = sections.setdefault(current_section, [])
+            if keep:
+                section_lines.append(stripped)
             continue
 
-        if current_section == "experience" and not _is_experience_line(stripped):
+        # Content after experience entries, which are only detected by
+        # keyword, goes to "other".
+        if current_section == "experience":
             current_section = "other"
 
         sections.setdefault(current_section, []).append(stripped)
@@ -124,65 +207,96 @@ def chunk_section_text(section_name: str, text: str) -> List[str]:
     return splitter.split_text(text)
 
 
-def get_embeddings_and_store(resume_text: str, jd_text: str):
-   
+def chunk_document(clean_text: str, doc_type: str) -> List[Tuple[str, Dict]]:
+    chunks_with_meta = []
+    for section_name, block in split_into_sections(clean_text, doc_type=doc_type).items():
+        chunks = chunk_section_text(section_name, block)
+        for i, ch in enumerate(chunks):
+            chunks_with_meta.append(
+                (ch, {"doc_type": doc_type, "section": section_name, "chunk_id": i})
+            )
+    return chunks_with_meta
 
-    resume_clean = basic_clean(resume_text)
-    jd_clean = basic_clean(jd_text)
 
-    resume_sections = split_into_sections(resume_clean)
-    jd_sections = split_into_sections(jd_clean)
+def _store_chunks(doc_type: str, ids, texts, metas, embeddings) -> Chroma:
+    db = Chroma(
+        collection_name=f"{doc_type}_{uuid.uuid4()}",
+        embedding_function=get_embedder(),
+        persist_directory=None,
+    )
 
-    resume_chunks_with_meta = []
-    jd_chunks_with_meta = []
+    register_collection(db, texts, metas)
+    if texts:
+        # The same vectors go to Chroma and the dense index.
+        db._collection.add(ids=ids, embeddings=embeddings, documents=texts, metadatas=metas)
+        index_texts(collection_name(db), ids, texts, metas)
+        index_embeddings(collection_name(db), ids, texts, metas, embeddings)
 
-    for section_name, block in resume_sections.items():
-        chunks = chunk_section_text(section_name, block)
-        for i, ch in enumerate(chunks):
-            resume_chunks_with_meta.append(
-                (ch, {"doc_type": "resume", "section": section_name, "chunk_id": i})
-            )
+    return db
 
-    for section_name, block in jd_sections.items():
-        chunks = chunk_section_text(section_name, block)
-        for i, ch in enumerate(chunks):
-            jd_chunks_with_meta.append(
-                (ch, {"doc_type": "jd", "section": section_name, "chunk_id": i})
-            )
 
-   
+def _build_store(clean_text: str, doc_type: str) -> Tuple[Chroma, int]:
+    chunks_with_meta = chunk_document(clean_text, doc_type)
 
-    embedder = HuggingFaceEmbeddings(model_name=EMBED_MODEL)
+    texts = [t for t, _ in chunks_with_meta]
+    metas = [m for _, m in chunks_with_meta]
+    ids = [str(uuid.uuid4()) for _ in chunks_with_meta]
+    embeddings = get_embedder().embed_documents(texts) if texts else []
 
-    resume_db = Chroma(
-        collection_name=f"resume_{uuid.uuid4()}",
-        embedding_function=embedder,
-        persist_directory=None,
-    )
+    return _store_chunks(doc_type, ids, texts, metas, embeddings), len(chunks_with_meta)
 
-    jd_db = Chroma(
-        collection_name=f"jd_{uuid.uuid4()}",
-        embedding_function=embedder,
-        persist_directory=None,
-    )
 
-    if resume_chunks_with_meta:
-        resume_db.add_texts(
-            texts=[t for t, _ in resume_chunks_with_meta],
-            ids=[str(uuid.uuid4()) for _ in resume_chunks_with_meta],
-            metadatas=[m for _, m in resume_chunks_with_meta],
-        )
+def build_library_store(records: List[Dict]) -> Tuple[Chroma, int]:
+    """
+    One collection holding the stored chunks of the given library JDs;
+    nothing is embedded. The collection is registered but not acquired.
+    """
+    library = get_library()
+    ids, texts, metas, embeddings = [], [], [], []
+    for record in records:
+        r_ids, r_texts, r_metas, r_embeddings = library.rows(record)
+        ids += r_ids
+        texts += r_texts
+        metas += r_metas
+        embeddings += r_embeddings.tolist()
+    return _store_chunks("jd", ids, texts, metas, embeddings), len(texts)
+
+
+def _get_or_build_store(raw_text: str, doc_type: str) -> Tuple[Chroma, int, bool]:
+    clean = basic_clean(raw_text)
+
+    build = lambda: _build_store(clean, doc_type)
+    if doc_type == "jd":
+        record = find_library_jd(clean)
+        if record is not None:
+            build = lambda: build_library_store([record])
+
+    return get_or_build(content_key(doc_type, clean), build)
+
+
+def get_resume_store(resume_text: str) -> Tuple[Chroma, int, bool]:
+    """(collection, chunk count, cache hit) for a resume alone, acquired for the caller."""
+    return _get_or_build_store(resume_text, "resume")
+
+
+def get_embeddings_and_store(resume_text: str, jd_text: str):
+    """
+    Chunk and embed a resume and a JD into their own collections. Documents
+    seen before are served from the ingestion cache without re-embedding,
+    and a JD stored in the JD library reuses its stored chunks and vectors.
+
+    Both collections are acquired for the caller, who must release them
+    (collection_registry.release_collection) or hand them to a session.
+    """
 
-    if jd_chunks_with_meta:
-        jd_db.add_texts(
-            texts=[t for t, _ in jd_chunks_with_meta],
-            ids=[str(uuid.uuid4()) for _ in jd_chunks_with_meta],
-            metadatas=[m for _, m in jd_chunks_with_meta],
-        )
+    resume_db, resume_chunks, resume_cached = _get_or_build_store(resume_text, "resume")
+    jd_db, jd_chunks, jd_cached = _get_or_build_store(jd_text, "jd")
 
     return {
-        "resume_chunks": len(resume_chunks_with_meta),
-        "jd_chunks": len(jd_chunks_with_meta),
+        "resume_chunks": resume_chunks,
+        "jd_chunks": jd_chunks,
         "resume_db": resume_db,
         "jd_db": jd_db,
+        "resume_cached": resume_cached,
+        "jd_cached": jd_cached,
     }
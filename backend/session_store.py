@@ -0,0 +1,205 @@
+"""
+Per-user runtime state shared between /analyze and /chat.
+
+Each /analyze call creates a session holding its own resume/JD collections,
+scores and chat history, keyed by the session ID returned to the client.
+Sessions are evicted when idle for longer than SESSION_TTL_SECONDS, and
+least-recently-used sessions are evicted when the session count or total
+chunk count goes over its cap.
+"""
+
+import os
+import time
+import uuid
+from collections import OrderedDict
+from threading import Event, Lock, Thread
+from typing import Dict, List, Optional
+
+from langchain_chroma import Chroma
+
+from collection_registry import acquire_collection, reap_orphans, release_collection
+
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "3600"))
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "200"))
+# Rough memory cap: total resume + JD chunks held across all sessions.
+MAX_SESSION_CHUNKS = int(os.getenv("MAX_SESSION_CHUNKS", "20000"))
+
+CHAT_HISTORY_LIMIT = 12
+
+REAPER_INTERVAL_SECONDS = float(os.getenv("REAPER_INTERVAL_SECONDS", "60"))
+# Collections never attached to a session (e.g. failed /analyze) are
+# deleted once they are this old.
+ORPHAN_GRACE_SECONDS = float(os.getenv("ORPHAN_GRACE_SECONDS", "600"))
+
+
+class Session:
+    def __init__(
+        self,
+        session_id: str,
+        resume_db: Optional[Chroma],
+        jd_db: Optional[Chroma],
+        chunk_count: int = 0,
+        resume_text: str = "",
+        jd_text: str = "",
+        similarity_score: Optional[float] = None,
+        match_score: Optional[float] = None,
+    ):
+        self.session_id = session_id
+        self.resume_db = resume_db
+        self.jd_db = jd_db
+        self.chunk_count = chunk_count
+        self.resume_text = resume_text
+        self.jd_text = jd_text
+        self.similarity_score = similarity_score
+        self.match_score = match_score
+
+        self.chat_history: List[Dict[str, str]] = []
+        self.lock = Lock()
+
+        self.created_at = time.time()
+        self.last_access = self.created_at
+
+    def add_chat_turn(self, role: str, content: str):
+        with self.lock:
+            self.chat_history.append({"role": role, "content": content})
+            self.chat_history = self.chat_history[-CHAT_HISTORY_LIMIT:]
+
+    def history_snapshot(self) -> List[Dict[str, str]]:
+        with self.lock:
+            return list(self.chat_history)
+
+
+_sessions: "OrderedDict[str, Session]" = OrderedDict()
+_lock = Lock()
+
+
+def _is_expired(session: Session, now: float) -> bool:
+    return now - session.last_access > SESSION_TTL_SECONDS
+
+
+def _release(session: Session):
+    for db in (session.resume_db, session.jd_db):
+        release_collection(db)
+
+
+def _evict_locked(now: float) -> List[Session]:
+    evicted = []
+
+    for sid in [sid for sid, s in _sessions.items() if _is_expired(s, now)]:
+        evicted.append(_sessions.pop(sid))
+
+    total_chunks = sum(s.chunk_count for s in _sessions.values())
+    # The most recently used session is always kept.
+    while len(_sessions) > 1 and (len(_sessions) > MAX_SESSIONS or total_chunks > MAX_SESSION_CHUNKS):
+        _, oldest = _sessions.popitem(last=False)
+        total_chunks -= oldest.chunk_count
+        evicted.append(oldest)
+
+    return evicted
+
+
+def create_session(session_id: Optional[str] = None, **fields) -> Session:
+    """
+    Store a new session. Passing an existing session_id replaces that
+    session (e.g. when the same user re-runs /analyze).
+
+    The session takes over the caller's reference on resume_db / jd_db,
+    as returned by get_embeddings_and_store.
+    """
+    session = Session(session_id or uuid.uuid4().hex, **fields)
+
+    with _lock:
+        replaced = _sessions.pop(session.session_id, None)
+        _sessions[session.session_id] = session
+        evicted = _evict_locked(time.time())
+
+    for old in ([replaced] if replaced else []) + evicted:
+        if old is not session:
+            _release(old)
+
+    return session
+
+
+def get_session(session_id: Optional[str], acquire: bool = False) -> Optional[Session]:
+    """
+    With acquire=True the session's collections are acquired before the
+    session can be evicted, and the caller must release both.
+    """
+    if not session_id:
+        return None
+
+    now = time.time()
+    with _lock:
+        session = _sessions.get(session_id)
+        if session is None:
+            return None
+        if _is_expired(session, now):
+            del _sessions[session_id]
+            expired = session
+            session = None
+        else:
+            session.last_access = now
+            _sessions.move_to_end(session_id)
+            expired = None
+            if acquire:
+                acquire_collection(session.resume_db)
+                acquire_collection(session.jd_db)
+
+    if expired is not None:
+        _release(expired)
+    return session
+
+
+def delete_session(session_id: str) -> bool:
+    with _lock:
+        session = _sessions.pop(session_id, None)
+    if session is None:
+        return False
+    _release(session)
+    return True
+
+
+def evict_expired() -> int:
+    with _lock:
+        evicted = _evict_locked(time.time())
+    for s in evicted:
+        _release(s)
+    return len(evicted)
+
+
+def session_stats() -> Dict[str, int]:
+    with _lock:
+        return {
+            "sessions": len(_sessions),
+            "chunks": sum(s.chunk_count for s in _sessions.values()),
+            "max_sessions": MAX_SESSIONS,
+            "max_chunks": MAX_SESSION_CHUNKS,
+        }
+
+
+_reaper_stop = Event()
+_reaper_thread: Optional[Thread] = None
+
+
+def _reap_loop():
+    while not _reaper_stop.wait(REAPER_INTERVAL_SECONDS):
+        try:
+            sessions = evict_expired()
+            orphans = reap_orphans(ORPHAN_GRACE_SECONDS)
+            if sessions or orphans:
+                print(f"🧹 Reaped {sessions} sessions, {orphans} orphaned collections")
+        except Exception as e:
+            print(f"⚠️ Session reaper error: {e}")
+
+
+def start_reaper():
+    global _reaper_thread
+    if _reaper_thread is not None and _reaper_thread.is_alive():
+        return
+    _reaper_stop.clear()
+    _reaper_thread = Thread(target=_reap_loop, name="session-reaper", daemon=True)
+    _reaper_thread.start()
+
+
+def stop_reaper():
+    _reaper_stop.set()
@@ -1,11 +1,38 @@
 
-from sentence_transformers import SentenceTransformer, util
+import os
+from typing import Dict, List, Tuple
 
-embed_model = SentenceTransformer("BAAI/bge-base-en-v1.5")
+from model_registry import get_similarity_model
+
+# document: encode the whole resume and JD with the bge-base similarity model
+#           (truncated at the model's token limit)
+# chunk: reuse the bge-small chunk embeddings already stored in Chroma and
+#        pool a resume-chunk x JD-chunk similarity matrix per JD section
+SIMILARITY_MODES = ("document", "chunk")
+SIMILARITY_MODE = os.getenv("SIMILARITY_MODE", "document").lower()
+if SIMILARITY_MODE not in SIMILARITY_MODES:
+    raise ValueError(f"Unknown SIMILARITY_MODE '{SIMILARITY_MODE}', expected one of {SIMILARITY_MODES}")
+
+# How much each JD section counts towards the chunk-level score. Keys are
+# the sections the JD sectioner emits (resume_jd_rag.JD_HEADING_KEYWORDS,
+# plus "other" for text before the first heading).
+JD_SECTION_WEIGHTS = {
+    "requirements": 3.0,
+    "skills": 3.0,
+    "responsibilities": 2.0,
+    "preferred": 1.5,
+    "other": 1.0,
+    "summary": 0.5,
+    "education": 0.5,
+    "benefits": 0.25,
+}
+DEFAULT_SECTION_WEIGHT = 1.0
 
 
 def compute_similarity_score(resume_text: str, jd_text: str):
-    
+    from sentence_transformers import util
+
+    embed_model = get_similarity_model()
 
     resume_embed = embed_model.encode(resume_text, convert_to_tensor=True)
     jd_embed = embed_model.encode(jd_text, convert_to_tensor=True)
@@ -15,3 +42,73 @@ def compute_similarity_score(resume_text: str, jd_text: str):
     match_score = round(similarity * 10, 2)
 
     return similarity, match_score
+
+
+def compute_similarity_scores(anchor_text: str, other_texts: List[str]) -> List[Tuple[float, float]]:
+    """
+    Score one document against many in a single batched encode.
+    Returns (similarity, match_score) per entry of other_texts.
+    """
+    if not other_texts:
+        return []
+
+    embed_model = get_similarity_model()
+
+    anchor_embed = embed_model.encode(anchor_text, normalize_embeddings=True)
+    other_embeds = embed_model.encode(other_texts, batch_size=32, normalize_embeddings=True)
+
+    similarities = other_embeds @ anchor_embed
+
+    return [(float(sim), round(float(sim) * 10, 2)) for sim in similarities]
+
+
+def section_scores_from_embeddings(resume_matrix, jd_matrix, jd_sections: List[str]) -> Dict[str, float]:
+    """
+    For every JD section: the mean, over its chunks, of the best cosine
+    match among all resume chunks (max pooling over the resume side).
+    Both matrices hold normalized chunk embeddings.
+    """
+    import numpy as np
+
+    if not len(resume_matrix) or not len(jd_matrix):
+        return {}
+
+    best_match = (jd_matrix @ resume_matrix.T).max(axis=1)
+
+    sections = np.array(jd_sections)
+    return {
+        str(section): float(best_match[sections == section].mean())
+        for section in np.unique(sections)
+    }
+
+
+def chunk_section_scores(resume_db, jd_db) -> Dict[str, float]:
+    from dense_index import get_dense_index
+
+    if resume_db is None or jd_db is None:
+        return {}
+
+    # Normalized chunk embeddings, loaded once per collection.
+    resume_index = get_dense_index(resume_db)
+    jd_index = get_dense_index(jd_db)
+
+    return section_scores_from_embeddings(
+        resume_index.matrix, jd_index.matrix, [m.get("section", "other") for m in jd_index.metas]
+    )
+
+
+def weighted_section_similarity(section_scores: Dict[str, float]) -> Tuple[float, float]:
+    if not section_scores:
+        return 0.0, 0.0
+
+    weights = {s: JD_SECTION_WEIGHTS.get(s, DEFAULT_SECTION_WEIGHT) for s in section_scores}
+    similarity = sum(section_scores[s] * w for s, w in weights.items()) / sum(weights.values())
+
+    match_score = round(similarity * 10, 2)
+
+    return similarity, match_score
+
+
+def compute_chunk_similarity_score(resume_db, jd_db):
+    """Section-weighted chunk-level similarity, returned like compute_similarity_score."""
+    return weighted_section_similarity(chunk_section_scores(resume_db, jd_db))
@@ -1,22 +1,22 @@
 
 from fastapi import APIRouter, UploadFile, File
 from groq import Groq
-import os
+
+from executors import run_io
+from llm_client import get_groq_client
 
 router = APIRouter()
 
-def get_client():
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        raise RuntimeError("Missing GROQ_API_KEY for speech-to-text")
-    return Groq(api_key=api_key)
+def get_client() -> Groq:
+    return get_groq_client()
 
 @router.post("/speech-to-text")
 async def speech_to_text(audio: UploadFile = File(...)):
 
     client = get_client()
 
-    resp = client.audio.transcriptions.create(
+    resp = await run_io(
+        client.audio.transcriptions.create,
         model="whisper-large-v3",
         file=(audio.filename, await audio.read())
     )
@@ -0,0 +1,24 @@
+"""Helpers for Server-Sent Events responses."""
+
+import json
+from typing import Any, Iterable, Iterator
+
+from fastapi.responses import StreamingResponse
+
+# Disable proxy buffering so tokens reach the client as they are produced.
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_response(events: Iterable[str]) -> StreamingResponse:
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+def token_events(tokens: Iterator[str], parts: list) -> Iterator[str]:
+    """Forward LLM tokens as "token" events, collecting them into parts."""
+    for token in tokens:
+        parts.append(token)
+        yield sse_event("token", {"text": token})
@@ -30,6 +30,9 @@ export default function Analyzer() {
     if (jdFile) formData.append("jd_file", jdFile);
     else if (jdText.trim()) formData.append("jd_text", jdText);
 
+    const sessionId = localStorage.getItem("sessionId");
+    if (sessionId) formData.append("session_id", sessionId);
+
     try {
       const res = await fetch("http://localhost:8000/analyze", {
         method: "POST",
@@ -37,6 +40,7 @@ export default function Analyzer() {
       });
 
       const data = await res.json();
+      if (data.session_id) localStorage.setItem("sessionId", data.session_id);
       setParsed(data);
     } catch {
       alert("Error reaching backend");
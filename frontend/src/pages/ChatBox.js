@@ -73,14 +73,19 @@ export default function ChatBox() {
       const res = await fetch("http://localhost:8000/api/chat", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ message: query }),
+        body: JSON.stringify({
+          message: query,
+          session_id: localStorage.getItem("sessionId"),
+        }),
       });
 
       const data = await res.json();
+      if (res.status === 404) localStorage.removeItem("sessionId");
+      const answer = data.answer || data.detail;
 
-      setMessages((prev) => [...prev, { role: "assistant", content: data.answer }]);
+      setMessages((prev) => [...prev, { role: "assistant", content: answer }]);
 
-      if (voiceEnabled) speak(data.answer);
+      if (voiceEnabled) speak(answer);
     } catch {
   
       setRecordingStatus("⚠️ Chat error");